@@ -1,21 +1,22 @@
+import sys
 import time
 import os
 from datetime import datetime
 from pathlib import Path
 import platform
 from typing import List
-import pandas as pd
 
-from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.support.ui import WebDriverWait, Select
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
 
-import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+from run_jobs import upload_export
+from xlsx_ingest import read_export
+from browser_ready import Readiness
+from browser_session import BrowserSession
+from download_watch import DownloadWatcher
+from export_capture import ExportCapture
 
 
 # -------------------------
@@ -39,6 +40,10 @@ GOOGLE_SHEET_URL = "https://docs.google.com/spreadsheets/d/1fnOSIWQa_mbfMHdgPatj
 SHEET_NAME = "Zipper Raw"
 
 KEEP_BROWSER_ON_ERROR = True
+CAPTURE_IN_MEMORY = True   # take the export straight from the browser's XHR; the download folder is only a fallback
+
+# Deadlines (seconds) of the readiness waits; each step returns as soon as Odoo is ready
+STEP_TIMEOUTS = {"login": 60, "search": 180, "select_all": 60, "menu": 30, "template": 30}
 
 
 # -------------------------
@@ -60,71 +65,6 @@ def ensure_dir(p: Path) -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def file_snapshot(dirs: List[Path]):
-    """Return set of existing file paths (excluding .crdownload) across dirs."""
-    snap = set()
-    for d in dirs:
-        if not d.exists():
-            continue
-        for f in d.iterdir():
-            if f.is_file() and not f.name.endswith(".crdownload"):
-                snap.add(f.resolve())
-    return snap
-
-def wait_for_new_download(dirs: List[Path], before_set, timeout: int = 180) -> Path:
-    """
-    Detect a new file appearing in 'dirs' compared to before_set.
-    Wait until any .crdownload for it is gone; return the final Path.
-    """
-    log(f"Watching for new download in: {', '.join(map(str, dirs))} (timeout {timeout}s)")
-    start = time.time()
-
-    def partial_exists_for(path: Path) -> bool:
-        for d in dirs:
-            if (d / (path.name + ".crdownload")).exists():
-                return True
-        return False
-
-    while time.time() - start < timeout:
-        after = file_snapshot(dirs)
-        new_files = list(after - before_set)
-        if new_files:
-            candidate = max(new_files, key=lambda p: p.stat().st_mtime)
-            if candidate.exists() and not partial_exists_for(candidate):
-                return candidate
-        time.sleep(1)
-
-    raise TimeoutError("Download did not appear/complete within timeout (snapshot mode).")
-
-def wait_for_download_since(dirs: List[Path], since_ts: float, timeout: int = 180) -> Path:
-    """
-    Return the newest file whose mtime >= since_ts and not a .crdownload.
-    Handles same-filename overwrite cases.
-    """
-    log(f"Waiting for file modified since {datetime.fromtimestamp(since_ts).strftime('%H:%M:%S')} (timeout {timeout}s)")
-    start = time.time()
-    while time.time() - start < timeout:
-        candidates = []
-        for d in dirs:
-            if not d.exists():
-                continue
-            for f in d.iterdir():
-                if f.is_file() and not f.name.endswith(".crdownload"):
-                    try:
-                        mtime = f.stat().st_mtime
-                    except Exception:
-                        continue
-                    if mtime >= since_ts:
-                        candidates.append((mtime, f.resolve()))
-        if candidates:
-            candidates.sort(key=lambda x: x[0], reverse=True)
-            newest = candidates[0][1]
-            # ensure no corresponding .crdownload exists
-            if not newest.with_name(newest.name + ".crdownload").exists():
-                return newest
-        time.sleep(1)
-    raise TimeoutError("No freshly modified file detected within timeout (mtime mode).")
-
 def pick_download_dirs(configured_dir: Path) -> List[Path]:
     """
     Candidate download dirs:
@@ -145,210 +85,167 @@ def pick_download_dirs(configured_dir: Path) -> List[Path]:
             seen.add(rp)
     return uniq
 
-def print_recent_files(dirs: List[Path], topn: int = 3):
-    for d in dirs:
-        try:
-            files = [f for f in d.iterdir() if f.is_file() and not f.name.endswith(".crdownload")]
-            files.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-            head = files[:topn]
-            if head:
-                log(f"Top {topn} recent in {d}:")
-                for f in head:
-                    log(f"  - {f.name}  mtime={datetime.fromtimestamp(f.stat().st_mtime).strftime('%H:%M:%S')}")
-        except Exception as e:
-            log(f"Could not list {d}: {e}")
-
 
 # -------------------------
-# SELENIUM OPTIONS
+# MAIN
 # -------------------------
-CONFIGURED_DIR = ensure_dir(Path.cwd() / "download")
-CANDIDATE_DIRS = pick_download_dirs(CONFIGURED_DIR)
-log("Candidate download directories:")
-for d in CANDIDATE_DIRS:
-    log(f"  - {d}")
-
-options = webdriver.ChromeOptions()
-options.add_argument("--headless=new")  # enable if needed
-options.add_argument("--disable-gpu")
-options.add_argument("--no-sandbox")
-options.add_argument("--disable-dev-shm-usage")
-options.add_experimental_option("prefs", {
-    "download.default_directory": str(CONFIGURED_DIR),
-    "download.prompt_for_download": False,
-    "safebrowsing.enabled": True,
-})
-
-driver = None
-success = False
-
-try:
-    log("Booting ChromeDriver...")
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-    wait = WebDriverWait(driver, 30)
-
-    # Allow downloads via CDP (extra safety)
-    try:
-        driver.execute_cdp_cmd("Page.setDownloadBehavior", {
-            "behavior": "allow",
-            "downloadPath": str(CONFIGURED_DIR)
-        })
-        log(f"CDP download path set to: {CONFIGURED_DIR}")
-    except Exception as e:
-        log(f"CDP setup skipped ({e})")
-
-    # -------------------------
-    # LOGIN
-    # -------------------------
-    log(f"Opening Odoo URL: {ODOO_URL}")
-    driver.get(ODOO_URL)
-
-    log("Waiting for login form...")
-    wait.until(EC.presence_of_element_located((By.NAME, "login")))
-    driver.find_element(By.NAME, "login").clear()
-    driver.find_element(By.NAME, "login").send_keys(EMAIL)
-    driver.find_element(By.NAME, "password").clear()
-    driver.find_element(By.NAME, "password").send_keys(PASSWORD)
-    log("Submitting login...")
-    driver.find_element(By.XPATH, "//button").click()
-
-    log("Waiting for workspace to load after login...")
-    time.sleep(8)
-
-    # -------------------------
-    # SEARCH
-    # -------------------------
-    log('Searching for "Standard items Stock"...')
-    search_box = wait.until(EC.presence_of_element_located((By.TAG_NAME, "input")))
-    search_box.clear()
-    search_box.send_keys("Standard items Stock")
-    search_box.send_keys(Keys.ENTER)
-
-    log("Waiting for list/table to render...")
-    time.sleep(60)
-
-    # -------------------------
-    # SELECT ALL ROWS
-    # -------------------------
-    log("Selecting all rows...")
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//table/thead/tr/th[1]"))).click()
-    time.sleep(2)
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Select all')]"))).click()
-    time.sleep(3)
-
-    # -------------------------
-    # EXPORT
-    # -------------------------
-    log("Opening 'Action' dropdown...")
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Action')]"))).click()
-    time.sleep(1)
-
-    log("Clicking 'Export'...")
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Export')]"))).click()
-
-    # Take a pre-download snapshot across candidate dirs
-    before = file_snapshot(CANDIDATE_DIRS)
-
-    # Export modal
-    log("Waiting for Export modal...")
-    time.sleep(2)
-    select_xpath = "/html/body/div[2]/div[2]/div/div/div/div/main/div/div[2]/div[3]/div/select"
-    dropdown_el = wait.until(EC.presence_of_element_located((By.XPATH, select_xpath)))
-
-    sel = Select(dropdown_el)
-    try:
-        log('Selecting "00-Ranak"...')
-        sel.select_by_visible_text("00-Ranak")
-        chosen = "00-Ranak"
-    except Exception as e:
-        log(f'"00-Ranak" not found ({e}). Selecting first option...')
-        if not sel.options:
-            raise RuntimeError("No options in export dropdown!")
-        sel.select_by_index(0)
-        chosen = sel.options[0].text.strip()
-    log(f'✅ Chosen template: {chosen}')
-
-    time.sleep(1)
-
-    # Record timing around the click for mtime-based detection
-    export_click_ready_ts = time.time()
-    log("Confirming export...")
-    wait.until(EC.element_to_be_clickable((By.XPATH, "//footer//button[contains(., 'Export')]"))).click()
-    time.sleep(1)
-    export_clicked_ts = time.time()
+def main() -> bool:
+    download_dir = ensure_dir(Path.cwd() / "download")
+    candidate_dirs = pick_download_dirs(download_dir)
+    log("Candidate download directories:")
+    for d in candidate_dirs:
+        log(f"  - {d}")
 
-    log("Export clicked. Monitoring for download (mtime-based first)...")
+    browser = BrowserSession("zipper", download_dir, headless=True, log=log)
+    driver = None
+    success = False
 
-    # -------- Primary: mtime-based (handles same-name overwrite) --------
     try:
-        latest_file = wait_for_download_since(CANDIDATE_DIRS, since_ts=export_clicked_ts, timeout=180)
-    except TimeoutError as e:
-        log(f"mtime-based detection timed out: {e}")
-        # -------- Fallback: snapshot-based --------
-        log("Falling back to snapshot-based detection...")
-        latest_file = wait_for_new_download(CANDIDATE_DIRS, before_set=before, timeout=60)
-
-    log(f"✅ Download complete: {latest_file} (dir: {latest_file.parent})")
-    if EXPECTED_NAME_HINT not in latest_file.name:
-        log(f"ℹ️ Note: filename doesn't contain hint '{EXPECTED_NAME_HINT}'. Name: {latest_file.name}")
-
-    # (Optional) Show recent files for verification
-    print_recent_files(CANDIDATE_DIRS, topn=3)
-
-    # -------------------------
-    # LOAD FILE
-    # -------------------------
-    log("Reading file into DataFrame...")
-    if latest_file.suffix.lower() in [".xlsx", ".xls"]:
-        df = pd.read_excel(latest_file)
-    elif latest_file.suffix.lower() == ".csv":
-        df = pd.read_csv(latest_file)
-    else:
-        raise ValueError(f"Unsupported file type: {latest_file.suffix}")
-    log(f"DataFrame shape: {df.shape}")
-
-    log("Keeping first 10 columns (A:J)...")
-    df = df.iloc[:, :10]
-
-    # -------------------------
-    # GOOGLE SHEETS
-    # -------------------------
-    log("Authorizing Google Sheets...")
-    scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-    creds = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-    client = gspread.authorize(creds)
-
-    log("Opening spreadsheet and worksheet...")
-    spreadsheet = client.open_by_url(GOOGLE_SHEET_URL)
-    worksheet = spreadsheet.worksheet(SHEET_NAME)
-
-    log("Clearing range A:J...")
-    worksheet.batch_clear(["A:J"])
-
-    log("Preparing values and uploading...")
-    values = [df.columns.values.tolist()] + df.values.tolist()
-    worksheet.update(f"A1:J{len(values)}", values)
-    log("✅ Uploaded to Google Sheet.")
-
-    # -------------------------
-    # CLEANUP
-    # -------------------------
-    try:
-        os.remove(latest_file)
-        log(f"🗑️ Deleted local file: {latest_file}")
+        log("Booting Chrome...")
+        driver = browser.start()
+        wait = WebDriverWait(driver, 30)
+        ready = Readiness(driver, log=log)
+        capture = ExportCapture(driver, log=log) if CAPTURE_IN_MEMORY else None
+
+        # -------------------------
+        # LOGIN
+        # -------------------------
+        log(f"Opening Odoo URL: {ODOO_URL}")
+        if not browser.login(ODOO_URL, DB, USERNAME, PASSWORD, ready, timeout=STEP_TIMEOUTS["login"]):
+            log("Waiting for login form...")
+            wait.until(EC.presence_of_element_located((By.NAME, "login")))
+            driver.find_element(By.NAME, "login").clear()
+            driver.find_element(By.NAME, "login").send_keys(USERNAME)
+            driver.find_element(By.NAME, "password").clear()
+            driver.find_element(By.NAME, "password").send_keys(PASSWORD)
+            log("Submitting login...")
+            mark = ready.mark()
+            driver.find_element(By.XPATH, "//button").click()
+
+            log("Waiting for workspace to load after login...")
+            ready.logged_in(mark, timeout=STEP_TIMEOUTS["login"])
+
+        # -------------------------
+        # SEARCH
+        # -------------------------
+        log('Searching for "Standard items Stock"...')
+        search_box = wait.until(EC.presence_of_element_located((By.TAG_NAME, "input")))
+        search_box.clear()
+        search_box.send_keys("Standard items Stock")
+        mark = ready.mark()
+        search_box.send_keys(Keys.ENTER)
+
+        log("Waiting for list/table to render...")
+        ready.list_loaded("search", mark, timeout=STEP_TIMEOUTS["search"])
+
+        # -------------------------
+        # SELECT ALL ROWS
+        # -------------------------
+        log("Selecting all rows...")
+        wait.until(EC.element_to_be_clickable((By.XPATH, "//table/thead/tr/th[1]"))).click()
+        select_all = ready.until("select_all_link", EC.element_to_be_clickable(
+            (By.XPATH, "//*[contains(text(), 'Select all')]")), timeout=STEP_TIMEOUTS["select_all"])
+        mark = ready.mark()
+        select_all.click()
+        ready.changed("select_all", "selection", mark, timeout=STEP_TIMEOUTS["select_all"])
+
+        # -------------------------
+        # EXPORT
+        # -------------------------
+        log("Opening 'Action' dropdown...")
+        wait.until(EC.element_to_be_clickable((By.XPATH, "//*[contains(text(), 'Action')]"))).click()
+
+        log("Clicking 'Export'...")
+        ready.until("action_menu", EC.element_to_be_clickable(
+            (By.XPATH, "//*[contains(text(), 'Export')]")), timeout=STEP_TIMEOUTS["menu"]).click()
+
+        # Export modal
+        log("Waiting for Export modal...")
+        select_xpath = "/html/body/div[2]/div[2]/div/div/div/div/main/div/div[2]/div[3]/div/select"
+        dropdown_el = ready.until("export_modal", EC.presence_of_element_located((By.XPATH, select_xpath)),
+                                  timeout=STEP_TIMEOUTS["menu"])
+
+        sel = Select(dropdown_el)
+        mark = ready.mark()
+        try:
+            log('Selecting "00-Ranak"...')
+            sel.select_by_visible_text("00-Ranak")
+            chosen = "00-Ranak"
+        except Exception as e:
+            log(f'"00-Ranak" not found ({e}). Selecting first option...')
+            if not sel.options:
+                raise RuntimeError("No options in export dropdown!")
+            sel.select_by_index(0)
+            chosen = sel.options[0].text.strip()
+        log(f'✅ Chosen template: {chosen}')
+
+        # Choosing a template loads its field list over RPC; export only once that is done
+        ready.settle("template", mark, timeout=STEP_TIMEOUTS["template"])
+
+        # Watch the download dirs from before the click: the first file Chrome finishes is ours
+        export_xpath = "//footer//button[contains(., 'Export')]"
+        captured, latest_file = None, None
+        use_capture = capture is not None and capture.available
+        with DownloadWatcher(candidate_dirs, log=log) as watcher:
+            if use_capture:
+                capture.arm()
+            log("Confirming export...")
+            wait.until(EC.element_to_be_clickable((By.XPATH, export_xpath))).click()
+            if use_capture:
+                captured = capture.wait(timeout=180)
+                if captured is None:
+                    log("No export request seen by the capture hook; falling back to the download folder...")
+                    capture.release(download_dir)
+                    wait.until(EC.element_to_be_clickable((By.XPATH, export_xpath))).click()
+            if captured is None:
+                log(f"Export clicked. Watching for download in: {', '.join(map(str, candidate_dirs))}")
+                latest_file = watcher.wait(timeout=180)
+                log(f"✅ Download complete: {latest_file} (dir: {latest_file.parent})")
+
+        ready.summary()
+        export_name = captured.name if captured else latest_file.name
+        if EXPECTED_NAME_HINT not in export_name:
+            log(f"ℹ️ Note: filename doesn't contain hint '{EXPECTED_NAME_HINT}'. Name: {export_name}")
+
+        # -------------------------
+        # LOAD FILE
+        # -------------------------
+        log("Reading export (first 10 columns, A:J)...")
+        source = captured.open() if captured else latest_file
+        suffix = captured.suffix if captured else latest_file.suffix.lower()
+        header, rows = read_export(source, suffix, ncols=10, log=log)
+
+        # -------------------------
+        # GOOGLE SHEETS
+        # -------------------------
+        log("Uploading changed cells (A:J)...")
+        upload_export(header, rows, SHEET_NAME, GOOGLE_SHEET_URL, width=10, log=log)
+
+        # -------------------------
+        # CLEANUP
+        # -------------------------
+        if latest_file:
+            try:
+                os.remove(latest_file)
+                log(f"🗑️ Deleted local file: {latest_file}")
+            except Exception as e:
+                log(f"⚠️ Could not delete file: {e}")
+
+        success = True
+
     except Exception as e:
-        log(f"⚠️ Could not delete file: {e}")
-
-    success = True
-
-except Exception as e:
-    log(f"❌ ERROR: {e}")
-finally:
-    if driver and (success or not KEEP_BROWSER_ON_ERROR):
-        log("Closing browser...")
-        driver.quit()
-    log(f"Done. success={success}, keep_on_error={KEEP_BROWSER_ON_ERROR}")
-    if driver and not success and KEEP_BROWSER_ON_ERROR:
-        log("Browser left open for inspection. Press Ctrl+C to stop the script when done.")
-        while True:
-            time.sleep(1)
+        log(f"❌ ERROR: {e}")
+    finally:
+        if driver and (success or not KEEP_BROWSER_ON_ERROR):
+            log("Closing browser...")
+            browser.close()
+        log(f"Done. success={success}, keep_on_error={KEEP_BROWSER_ON_ERROR}")
+        if driver and not success and KEEP_BROWSER_ON_ERROR:
+            log("Browser left open for inspection. Press Ctrl+C to stop the script when done.")
+            while True:
+                time.sleep(1)
+    return success
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,77 @@
+"""
+Memory and processing time of the export DataFrame: all-object columns vs the
+compact dtypes derived from fields_get (stream_decode.frame_dtypes).
+
+    python bench/bench_frame_dtypes.py --rows 500000
+
+Rows and field types come from the fake Odoo used by run_bench.py (first 10
+preset fields). "process" is a typical follow-up: group pending quantity by
+product, sort by date and filter one company. The rows rebuilt from the
+compact frame are checked to equal the exported ones.
+"""
+import argparse
+import os
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+sys.path.insert(0, HERE)
+
+import pandas as pd  # noqa: E402
+
+from fake_odoo import FIELDS, make_row  # noqa: E402
+from stream_decode import ColumnBuffers, column_kinds, compact_frame, frame_dtypes, frame_rows  # noqa: E402
+
+FIELD_NAMES = [f for f, _, _ in FIELDS[:10]]
+COLUMNS = [label for _, label, _ in FIELDS[:10]]
+FIELD_TYPES = {f: t for f, _, t in FIELDS}
+
+
+def process(df):
+    by_product = df.groupby("Product", observed=True)["Pending Qty"].sum()
+    latest = df.sort_values("Date").tail(1000)
+    metal = df[df["Company"] == "Metal"]
+    return len(by_product), len(latest), len(metal)
+
+
+def measure(label, build):
+    start = time.perf_counter()
+    df = build()
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    process(df)
+    processed = time.perf_counter() - start
+    mib = df.memory_usage(deep=True).sum() / 2**20
+    print(f"  {label:<22} {mib:9.1f} MiB  build {built:6.2f}s  process {processed:6.2f}s")
+    return df, mib, processed
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    args = ap.parse_args()
+
+    rows = [make_row(i, FIELD_NAMES) for i in range(1, args.rows + 1)]
+    kinds = column_kinds(FIELD_NAMES, FIELD_TYPES)
+    dtypes = frame_dtypes(FIELD_NAMES, FIELD_TYPES)
+    buffers = ColumnBuffers(COLUMNS, kinds)
+    for row in rows:
+        buffers.append(row)
+    print(f"{args.rows:,} rows × {len(COLUMNS)} columns; dtypes: "
+          + ", ".join(f"{c}={d or 'object'}" for c, d in zip(COLUMNS, dtypes)))
+
+    _, obj_mib, obj_s = measure("object columns", lambda: pd.DataFrame(rows, columns=COLUMNS, dtype=object))
+    measure(f"DataFrame(rows) {pd.__version__}", lambda: pd.DataFrame(rows, columns=COLUMNS))
+    measure("column buffers", buffers.to_dataframe)
+    compact, mib, proc_s = measure("compact dtypes", lambda: compact_frame(buffers.to_dataframe(), dtypes))
+    print(f"  memory ÷{obj_mib / mib:.1f}, processing ÷{obj_s / proc_s:.1f} vs object")
+
+    same = all(a == b for a, b in zip(frame_rows(compact, dtypes), rows))
+    print(f"  rows from compact frame equal the export: {same}")
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
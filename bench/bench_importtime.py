@@ -0,0 +1,82 @@
+"""
+Start-up import cost of each cli.py code path, measured with python -X importtime.
+
+    python bench/bench_importtime.py                 # exit 1 when a path is over budget
+    python bench/bench_importtime.py --runs 9 --scale 2.0
+
+Every path is imported in a fresh interpreter 'runs' times (after one warm-up
+run that writes the .pyc files); the median of the modules' cumulative import
+time is compared with its budget. A path also fails when it pulls in one of
+its forbidden heavy modules, whatever the timing.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# path: (modules imported, budget in ms, top-level packages that must not be imported)
+HEAVY = {"pandas", "numpy", "pyarrow", "openpyxl", "python_calamine", "selenium", "gspread", "oauth2client"}
+PATHS = {
+    "cli":     (["cli"], 30, HEAVY | {"requests"}),
+    "rpc":     (["run_jobs"], 400, HEAVY),
+    "upload":  (["run_jobs", "xlsx_ingest"], 400, HEAVY - {"python_calamine"}),
+    "browser": (["Zipper"], 900, {"pandas", "numpy", "pyarrow", "gspread", "oauth2client"}),
+}
+
+LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def measure(modules):
+    """One fresh interpreter: (cumulative ms of 'modules', top-level packages imported)."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + ", ".join(modules)],
+                          cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total, packages = 0, set()
+    for line in proc.stderr.splitlines():
+        m = LINE_RE.match(line)
+        if not m:
+            continue
+        packages.add(m.group(4).split(".")[0])
+        if not m.group(3) and m.group(4) in modules:
+            total += int(m.group(2))
+    return total / 1000, packages
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Import-time budget of the cli.py code paths")
+    ap.add_argument("--paths", nargs="+", choices=list(PATHS), default=list(PATHS))
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow machines)")
+    args = ap.parse_args()
+
+    failures = []
+    print(f"{'path':<10}{'median_ms':>10}{'budget_ms':>10}  heavy imports")
+    for name in args.paths:
+        modules, budget, forbidden = PATHS[name]
+        try:
+            measure(modules)  # warm-up: .pyc files
+            samples = [measure(modules) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{name:<10}{'-':>10}{'-':>10}  skipped ({e})")
+            continue
+        median = statistics.median(ms for ms, _ in samples)
+        heavy = sorted(samples[0][1] & forbidden)
+        print(f"{name:<10}{median:>10.0f}{budget * args.scale:>10.0f}  {', '.join(heavy) or '-'}")
+        if median > budget * args.scale:
+            failures.append(f"{name}: {median:.0f} ms > {budget * args.scale:.0f} ms")
+        if heavy:
+            failures.append(f"{name}: imports {', '.join(heavy)}")
+
+    if failures:
+        print("❌ Over budget:\n  " + "\n  ".join(failures))
+        sys.exit(1)
+    print("✅ Import times within budget.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Peak-RSS benchmark: r.json() + DataFrame(rows) vs streaming decode into column buffers.
+
+    python bench/bench_stream_decode.py --rows 500000
+
+Each mode runs in a fresh subprocess so ru_maxrss is not shared between them.
+This covers the decode step only: the Sheets values, the diff and the sheet
+snapshot still hold full rows. For the whole pipeline compare
+    python bench/run_bench.py --rows 150000 --engines json json-list
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_decode import decode_export_stream  # noqa: E402
+
+COLUMNS = ["Inventory Code", "Product", "Product Type", "Qty", "UoM",
+           "Company", "Date", "Unit Price", "Lot", "Remarks"]
+KINDS = ["str", "str", "str", "float", "str", "str", "str", "float", "int", "str"]
+
+
+def write_payload(path, n_rows, seed=1):
+    rnd = random.Random(seed)
+    products = [f"Product {i:05d}" for i in range(2000)]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"jsonrpc": "2.0", "id": null, "result": {"datas": [')
+        for i in range(n_rows):
+            row = [f"INV-{i:07d}", rnd.choice(products), rnd.choice(["Metal", "Zipper", "Tape"]),
+                   round(rnd.uniform(0, 5000), 2), rnd.choice(["Pcs", "Kg", "Yds"]),
+                   rnd.choice(["Metal", "Zipper"]), f"2025-08-{rnd.randint(1, 31):02d}",
+                   round(rnd.uniform(0, 20), 4), rnd.randint(1, 99999) if rnd.random() > 0.1 else False,
+                   "" if rnd.random() > 0.2 else "check"]
+            f.write(("," if i else "") + json.dumps(row))
+        f.write("]}}")
+
+
+def child(mode, path):
+    start = time.perf_counter()
+    if mode == "json":
+        with open(path, "rb") as fp:
+            rows = json.load(fp)["result"]["datas"]
+        try:
+            import pandas as pd
+            frame = pd.DataFrame(rows, columns=COLUMNS)
+            n = len(frame)
+        except ImportError:
+            n = len(rows)
+    else:
+        with open(path, "rb") as fp:
+            buffers = decode_export_stream(fp, COLUMNS, KINDS)
+        try:
+            n = len(buffers.to_dataframe())
+        except ImportError:
+            n = len(buffers)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({"mode": mode, "rows": n, "seconds": elapsed, "peak_mb": peak_kb / 1024}))
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--child", nargs=2, metavar=("MODE", "PATH"), help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if args.child:
+        return child(*args.child)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "export.json")
+        write_payload(path, args.rows)
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"payload: {args.rows:,} rows, {size_mb:.1f} MB")
+        for mode in ("json", "stream"):
+            out = subprocess.run([sys.executable, __file__, "--child", mode, path],
+                                 capture_output=True, text=True, check=True).stdout
+            r = json.loads(out)
+            print(f"  {r['mode']:<7} rows={r['rows']:>9,}  {r['seconds']:7.2f}s  peak RSS {r['peak_mb']:8.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Local stand-in for the Odoo endpoints the export scripts use.
+
+    python bench/fake_odoo.py --rows 100000 --latency-ms 40 --port 8069
+
+Serves /web/session/authenticate, /web/session/get_session_info,
+/web/dataset/call_kw/<model>/<method> for search_read, read, fields_get, search
+and export_data, and /web (csrf_token) + /web/export/csv on a synthetic
+pending.stock.config dataset. Rows are derived
+from the record id, so 1M records cost no memory until they are exported.
+Prints "PORT <n>" once listening; GET /__stats returns request/byte counters.
+"""
+import argparse
+import csv
+import gzip
+import io
+import hashlib
+import json
+import random
+import secrets
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+MODEL = "pending.stock.config"
+EXPORT_ID = 670
+
+# (field name, label, type) — preset order; the sheet keeps the first 10
+FIELDS = [
+    ("inventory_code", "Inventory Code", "char"),
+    ("product_id", "Product", "many2one"),
+    ("product_type", "Product Type", "selection"),
+    ("quantity", "Pending Qty", "float"),
+    ("uom_id", "UoM", "many2one"),
+    ("company_id", "Company", "many2one"),
+    ("date", "Date", "date"),
+    ("price_unit", "Unit Price", "float"),
+    ("lot_count", "Lots", "integer"),
+    ("remarks", "Remarks", "char"),
+    ("location_id", "Location", "many2one"),
+    ("partner_id", "Supplier", "many2one"),
+    ("note", "Note", "text"),
+    ("create_uid", "Created by", "many2one"),
+]
+LINE_IDS = list(range(9001, 9001 + len(FIELDS)))
+PRODUCTS = [f"[P{i:05d}] Standard Item {i}" for i in range(3000)]
+WRITE_DATE = "2025-08-01 00:00:00"
+
+
+def _rnd(rec_id: int) -> random.Random:
+    return random.Random(int.from_bytes(hashlib.blake2b(str(rec_id).encode(), digest_size=8).digest(), "big"))
+
+
+def make_row(rec_id: int, field_names):
+    rnd = _rnd(rec_id)
+    vals = {
+        "inventory_code": f"INV-{rec_id:07d}",
+        "product_id": rnd.choice(PRODUCTS),
+        "product_type": rnd.choice(["Metal", "Zipper", "Tape", "Slider"]),
+        "quantity": round(rnd.uniform(0, 5000), 2),
+        "uom_id": rnd.choice(["Pcs", "Kg", "Yds", "Gross"]),
+        "company_id": rnd.choice(["Zipper", "Metal"]),
+        "date": f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+        "price_unit": round(rnd.uniform(0, 20), 4),
+        "lot_count": rnd.randint(0, 40),
+        "remarks": rnd.choice(["", "", "", "urgent", "check qty"]),
+        "location_id": f"WH/Stock/Shelf {rnd.randint(1, 60)}",
+        "partner_id": f"Supplier {rnd.randint(1, 400)}",
+        "note": "",
+        "create_uid": "Administrator",
+    }
+    row = []
+    for name in field_names:
+        if name == ".id":
+            row.append(rec_id)
+        elif name.endswith("/id"):
+            row.append(f"__export__.{name.split('/')[0]}_{rec_id}")
+        else:
+            row.append(vals.get(name.split("/")[0], ""))
+    return row
+
+
+class FakeOdoo:
+    def __init__(self, rows: int, latency_ms: float = 0.0, row_cost_us: float = 0.0):
+        self.ids = list(range(1, rows + 1))
+        self.latency = latency_ms / 1000.0
+        self.row_cost = row_cost_us / 1e6
+        self.sessions = {}  # session_id -> csrf token
+        self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0, "by_method": {}}
+        self.lock = threading.Lock()
+
+    def count(self, method, n_in, n_out):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += n_in
+            self.stats["bytes_out"] += n_out
+            self.stats["by_method"][method] = self.stats["by_method"].get(method, 0) + 1
+
+    # ---- RPC implementations ----
+    def call(self, model, method, args, kwargs):
+        if model == "ir.exports" and method == "search_read":
+            return [{"id": EXPORT_ID, "name": "00-Ranak", "resource": MODEL, "export_fields": LINE_IDS,
+                     "write_date": WRITE_DATE}]
+        if model == "ir.exports.line" and method == "read":
+            return [{"id": i, "name": FIELDS[i - LINE_IDS[0]][0]} for i in args[0] if i in LINE_IDS]
+        if model == "ir.exports.line" and method == "search_read":
+            return [{"id": i, "name": FIELDS[i - LINE_IDS[0]][0], "write_date": WRITE_DATE} for i in LINE_IDS]
+        if model != MODEL:
+            raise KeyError(f"unknown model {model}")
+        if method == "fields_get":
+            wanted = args[0] if args else [f for f, _, _ in FIELDS]
+            return {f: {"string": s, "type": t} for f, s, t in FIELDS if f in wanted}
+        if method == "search":
+            return self.ids
+        if method == "search_read":
+            domain = args[0] if args else []
+            since = next((c[2] for c in domain if isinstance(c, list) and c[0] == "write_date"), None)
+            if since and since > WRITE_DATE:
+                return []
+            return [{"id": i, "write_date": WRITE_DATE} for i in self.ids]
+        if method == "read":
+            return [{"id": i, "write_date": WRITE_DATE} for i in args[0]]
+        if method == "export_data":
+            ids, field_names = args[0], args[1]
+            if self.row_cost:
+                time.sleep(self.row_cost * len(ids))
+            return {"datas": [make_row(i, field_names) for i in ids]}
+        raise KeyError(f"unknown method {model}.{method}")
+
+    def export_csv(self, data):
+        """Body of /web/export/csv, written like Odoo's CSVExport (False -> '', formula guard)."""
+        names = [f["name"] for f in data["fields"]]
+        if self.row_cost:
+            time.sleep(self.row_cost * len(data["ids"]))
+        out = io.StringIO()
+        w = csv.writer(out, quoting=csv.QUOTE_ALL)
+        w.writerow([f["label"] for f in data["fields"]])
+        for i in data["ids"]:
+            row = []
+            for v in make_row(i, names):
+                if isinstance(v, str) and v.startswith(("=", "-", "+")):
+                    v = "'" + v
+                row.append("" if v is None or v is False else str(v))
+            w.writerow(row)
+        return out.getvalue().encode("utf-8")
+
+
+def make_handler(app: FakeOdoo):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def _send(self, obj, method, n_in, cookie=None, content_type="application/json"):
+            body = obj if isinstance(obj, bytes) else json.dumps(obj).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                body = gzip.compress(body, compresslevel=1)
+                self.send_header("Content-Encoding", "gzip")
+            if cookie:
+                self.send_header("Set-Cookie", f"session_id={cookie}; Path=/; HttpOnly")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            app.count(method, n_in, len(body))
+
+        def _session(self):
+            for part in (self.headers.get("Cookie") or "").split(";"):
+                k, _, v = part.strip().partition("=")
+                if k == "session_id":
+                    return v
+            return None
+
+        def _to_login(self):
+            self.send_response(303)
+            self.send_header("Location", "/web/login")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def do_GET(self):
+            if self.path == "/__stats":
+                with app.lock:
+                    self._send(app.stats, "__stats", 0)
+            elif self.path == "/web/login":
+                self._send(b"<html><form action='/web/login'></form></html>", "login", 0, content_type="text/html")
+            elif self.path == "/web":
+                csrf = app.sessions.get(self._session())
+                if csrf is None:
+                    return self._to_login()
+                page = f'<html><script>var odoo = {{csrf_token: "{csrf}", debug: ""}};</script></html>'
+                self._send(page.encode(), "web", 0, content_type="text/html")
+            else:
+                self.send_error(404)
+
+        def do_POST(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if self.headers.get("Content-Encoding") == "gzip":
+                raw = gzip.decompress(raw)
+            if app.latency:
+                time.sleep(app.latency)
+            path = self.path.split("?")[0]
+
+            if path == "/web/export/csv":
+                form = {k: v[0] for k, v in parse_qs(raw.decode()).items()}
+                csrf = app.sessions.get(self._session())
+                if csrf is None:
+                    return self._to_login()
+                if form.get("csrf_token") != csrf:
+                    self.send_error(400, "Session expired (invalid CSRF token)")
+                    return
+                return self._send(app.export_csv(json.loads(form["data"])), "export_csv", len(raw),
+                                  content_type="text/csv;charset=utf8")
+
+            req = json.loads(raw or b"{}")
+
+            if path == "/web/session/authenticate":
+                sid = secrets.token_hex(16)
+                app.sessions[sid] = secrets.token_hex(20) + "o1"
+                return self._send({"jsonrpc": "2.0", "id": None, "result": {
+                    "uid": 2, "user_context": {"lang": "en_US", "tz": "Asia/Dhaka", "uid": 2}}},
+                    "authenticate", len(raw), cookie=sid)
+
+            if self._session() not in app.sessions:
+                return self._send({"jsonrpc": "2.0", "id": None, "error": {
+                    "code": 100, "message": "Odoo Session Expired",
+                    "data": {"name": "odoo.http.SessionExpiredException"}}}, "expired", len(raw))
+
+            if path == "/web/session/get_session_info":
+                return self._send({"jsonrpc": "2.0", "id": None, "result": {
+                    "uid": 2, "user_context": {"lang": "en_US", "tz": "Asia/Dhaka", "uid": 2}}},
+                    "get_session_info", len(raw))
+
+            if path.startswith("/web/dataset/call_kw/"):
+                p = req.get("params", {})
+                try:
+                    result = app.call(p.get("model"), p.get("method"), p.get("args") or [], p.get("kwargs") or {})
+                except Exception as e:
+                    return self._send({"jsonrpc": "2.0", "id": None, "error": {
+                        "code": 200, "message": str(e), "data": {"name": type(e).__name__}}},
+                        p.get("method", "?"), len(raw))
+                return self._send({"jsonrpc": "2.0", "id": None, "result": result}, p.get("method"), len(raw))
+
+            self.send_error(404)
+
+    return Handler
+
+
+def serve(rows, latency_ms=0.0, row_cost_us=0.0, port=0):
+    app = FakeOdoo(rows, latency_ms, row_cost_us)
+    srv = ThreadingHTTPServer(("127.0.0.1", port), make_handler(app))
+    srv.daemon_threads = True
+    return srv, app
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="added to every request")
+    ap.add_argument("--row-cost-us", type=float, default=0.0, help="export_data cost per record")
+    ap.add_argument("--port", type=int, default=0)
+    args = ap.parse_args()
+    srv, _ = serve(args.rows, args.latency_ms, args.row_cost_us, args.port)
+    print(f"PORT {srv.server_port}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
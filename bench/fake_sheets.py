@@ -0,0 +1,229 @@
+"""
+Local stand-in for the Google Sheets v4 endpoints the uploaders use.
+
+    python bench/fake_sheets.py --port 8090 --latency-ms 80
+
+Point the client at it with SHEETS_API_URL=http://127.0.0.1:<port>/v4 and no
+credentials. Serves spreadsheet metadata, values:batchGet, values:batchUpdate,
+values/<range> (PUT), values:batchClear and :batchUpdate (appendDimension).
+Writes beyond the grid fail like the real API; --writes-per-min simulates the
+write quota with 429s. GET /__stats returns counters, GET /__values?sheet=…
+the stored cells.
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+A1_RE = re.compile(r"^(?:(?P<sheet>'(?:[^']|'')+'|[^!]+)!)?(?P<c0>[A-Z]+)(?P<r0>\d*)(?::(?P<c1>[A-Z]+)(?P<r1>\d*))?$")
+
+
+def col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def parse_a1(a1: str, default_sheet: str = None):
+    """-> (sheet, col0, row0, col1, row1), 0-based, row1 None = open-ended."""
+    m = A1_RE.match(a1)
+    if not m:
+        raise ValueError(f"Unable to parse range: {a1}")
+    sheet = m["sheet"] or default_sheet
+    if sheet and sheet.startswith("'"):
+        sheet = sheet[1:-1].replace("''", "'")
+    c0 = col_index(m["c0"]) - 1
+    c1 = col_index(m["c1"] or m["c0"]) - 1
+    r0 = int(m["r0"]) - 1 if m["r0"] else 0
+    r1 = int(m["r1"]) - 1 if m["r1"] else (r0 if m["r0"] and not m["c1"] else None)
+    return sheet, c0, r0, c1, r1
+
+
+class GridError(Exception):
+    pass
+
+
+class FakeSheets:
+    def __init__(self, sheets=("Zipper Raw", "Metal Raw"), rows=1000, cols=26, latency_ms=0.0, writes_per_min=0):
+        self.sheets = {t: {"gid": 1000 + i, "rows": rows, "cols": cols, "cells": []} for i, t in enumerate(sheets)}
+        self.latency = latency_ms / 1000.0
+        self.writes_per_min = writes_per_min
+        self.write_times = deque()
+        self.lock = threading.RLock()
+        self.stats = {"requests": 0, "writes": 0, "throttled": 0, "bytes_in": 0, "bytes_out": 0, "cells_written": 0}
+
+    def _sheet(self, title):
+        if title not in self.sheets:
+            raise ValueError(f"Unable to parse range: {title}")
+        return self.sheets[title]
+
+    def throttle(self) -> bool:
+        if not self.writes_per_min:
+            return False
+        now = time.monotonic()
+        while self.write_times and now - self.write_times[0] > 60:
+            self.write_times.popleft()
+        if len(self.write_times) >= self.writes_per_min:
+            self.stats["throttled"] += 1
+            return True
+        self.write_times.append(now)
+        return False
+
+    def write(self, a1, values):
+        title, c0, r0, _, _ = parse_a1(a1)
+        sh = self._sheet(title)
+        if r0 + len(values) > sh["rows"]:
+            raise GridError(f"Range ('{title}'!{a1}) exceeds grid limits. Max rows: {sh['rows']}")
+        cells = sh["cells"]
+        while len(cells) < r0 + len(values):
+            cells.append([])
+        for i, row in enumerate(values):
+            target = cells[r0 + i]
+            if len(target) < c0 + len(row):
+                target.extend([""] * (c0 + len(row) - len(target)))
+            target[c0:c0 + len(row)] = [("" if v is None else v) for v in row]
+            self.stats["cells_written"] += len(row)
+
+    def clear(self, a1):
+        title, c0, r0, c1, r1 = parse_a1(a1)
+        cells = self._sheet(title)["cells"]
+        end = len(cells) if r1 is None else min(len(cells), r1 + 1)
+        for r in range(r0, end):
+            row = cells[r]
+            for c in range(c0, min(c1 + 1, len(row))):
+                row[c] = ""
+
+    def get(self, a1):
+        title, c0, r0, c1, r1 = parse_a1(a1)
+        cells = self._sheet(title)["cells"]
+        end = len(cells) if r1 is None else min(len(cells), r1 + 1)
+        out = [[v for v in cells[r][c0:c1 + 1]] for r in range(r0, end)]
+        for row in out:  # trailing empty cells/rows are omitted, as the real API does
+            while row and row[-1] == "":
+                row.pop()
+        while out and not out[-1]:
+            out.pop()
+        return out
+
+
+def make_handler(app: FakeSheets):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, *a):
+            pass
+
+        def _send(self, obj, status=200):
+            body = json.dumps(obj).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            with app.lock:
+                app.stats["bytes_out"] += len(body)
+
+        def _error(self, status, message):
+            self._send({"error": {"code": status, "message": message}}, status)
+
+        def _body(self):
+            raw = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            with app.lock:
+                app.stats["requests"] += 1
+                app.stats["bytes_in"] += len(raw)
+            return json.loads(raw or b"{}")
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            q = parse_qs(url.query)
+            if url.path == "/__stats":
+                return self._send(app.stats)
+            if url.path == "/__values":
+                return self._send(app.get(f"'{q['sheet'][0]}'!A:ZZ"))
+            self._body()
+            if app.latency:
+                time.sleep(app.latency)
+            m = re.match(r"^/v4/spreadsheets/([^/:]+)(/values:batchGet)?$", url.path)
+            if not m:
+                return self._error(404, "not found")
+            with app.lock:
+                try:
+                    if m.group(2):
+                        return self._send({"valueRanges": [{"range": r, "values": app.get(r)} for r in q.get("ranges", [])]})
+                    return self._send({"sheets": [
+                        {"properties": {"sheetId": s["gid"], "title": t,
+                                        "gridProperties": {"rowCount": s["rows"], "columnCount": s["cols"]}}}
+                        for t, s in app.sheets.items()]})
+                except ValueError as e:
+                    return self._error(400, str(e))
+
+        def _write(self, fn):
+            body = self._body()
+            if app.latency:
+                time.sleep(app.latency)
+            with app.lock:
+                if app.throttle():
+                    return self._error(429, "Quota exceeded for quota metric 'Write requests'")
+                app.stats["writes"] += 1
+                try:
+                    return self._send(fn(body) or {})
+                except (ValueError, GridError) as e:
+                    return self._error(400, str(e))
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if path.endswith("/values:batchUpdate"):
+                return self._write(lambda b: [app.write(d["range"], d.get("values", [])) for d in b["data"]] and None)
+            if path.endswith("/values:batchClear"):
+                return self._write(lambda b: [app.clear(r) for r in b["ranges"]] and None)
+            if path.endswith(":batchUpdate"):
+                def grid(b):
+                    for req in b.get("requests", []):
+                        ad = req.get("appendDimension")
+                        if ad:
+                            sh = next(s for s in app.sheets.values() if s["gid"] == ad["sheetId"])
+                            sh["rows" if ad["dimension"] == "ROWS" else "cols"] += ad["length"]
+                return self._write(grid)
+            self._body()
+            self._error(404, "not found")
+
+        def do_PUT(self):
+            path = urlparse(self.path).path
+            m = re.match(r"^/v4/spreadsheets/[^/]+/values/(.+)$", path)
+            if not m:
+                self._body()
+                return self._error(404, "not found")
+            a1 = unquote(m.group(1))
+            return self._write(lambda b: app.write(a1, b.get("values", [])))
+
+    return Handler
+
+
+def serve(latency_ms=0.0, writes_per_min=0, port=0, sheets=("Zipper Raw", "Metal Raw")):
+    app = FakeSheets(sheets=sheets, latency_ms=latency_ms, writes_per_min=writes_per_min)
+    srv = ThreadingHTTPServer(("127.0.0.1", port), make_handler(app))
+    srv.daemon_threads = True
+    return srv, app
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--port", type=int, default=0)
+    ap.add_argument("--latency-ms", type=float, default=0.0)
+    ap.add_argument("--writes-per-min", type=int, default=0, help="simulate the write quota (0 = unlimited)")
+    args = ap.parse_args()
+    srv, _ = serve(args.latency_ms, args.writes_per_min, args.port)
+    print(f"PORT {srv.server_port}", flush=True)
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
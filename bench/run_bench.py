@@ -0,0 +1,186 @@
+"""
+Offline benchmark of the RPC export pipeline (run_jobs.py) against local fake
+Odoo and Sheets servers.
+
+    python bench/run_bench.py --rows 1000 10000 100000 --latency-ms 30 --sheets-latency-ms 60
+    python bench/run_bench.py --rows 100000 --save bench/baseline.json
+    python bench/run_bench.py --rows 100000 --baseline bench/baseline.json   # exit 1 on regression
+    python bench/run_bench.py --rows 100000 --engines json csv               # export_data vs /web/export/csv
+    python bench/run_bench.py --rows 150000 --engines json json-list         # column buffers vs list of rows, end to end
+
+For every dataset size the servers run in their own processes and each
+pipeline run in a fresh child process, so timings and peak RSS only cover the
+client. Each scenario runs twice: "cold" (empty .cache) and "warm" (caches,
+session and sheet snapshot from the cold run).
+"""
+import argparse
+import json
+import os
+import resource
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# metrics compared against a baseline; larger is worse
+REGRESSION_METRICS = ("wall_s", "peak_mb", "odoo_bytes_in", "sheets_bytes_out")
+
+
+def start_server(script, *args):
+    p = subprocess.Popen([sys.executable, os.path.join(HERE, script), *map(str, args)],
+                         stdout=subprocess.PIPE, text=True)
+    line = p.stdout.readline()
+    if not line.startswith("PORT "):
+        p.kill()
+        raise RuntimeError(f"{script} did not start: {line!r}")
+    return p, int(line.split()[1])
+
+
+def fetch_stats(url):
+    with urllib.request.urlopen(f"{url}/__stats") as r:
+        return json.load(r)
+
+
+# =========================
+# Child: one pipeline run
+# =========================
+def child(odoo_url, sheets_url, workdir, engine, jobs):
+    os.environ["SHEETS_API_URL"] = f"{sheets_url}/v4"
+    os.chdir(workdir)
+    sys.path.insert(0, ROOT)
+    import run_jobs
+
+    run_jobs.ODOO_URL, run_jobs.DB, run_jobs.USERNAME, run_jobs.PASSWORD = odoo_url, "bench", "bench", "bench"
+    run_jobs.SERVICE_ACCOUNT_JSON = None
+    run_jobs.JOB_DEFAULTS["engine"] = "json" if engine == "json-list" else engine
+    run_jobs.JOB_DEFAULTS["stream"] = engine != "json-list"
+    selected = [j for j in run_jobs.JOBS if not jobs or j["name"] in jobs]
+
+    t0 = time.perf_counter()
+    shared = run_jobs.connect()
+    t_connect = time.perf_counter() - t0
+    results = run_jobs.run(selected, shared)
+    wall = time.perf_counter() - t0
+
+    rpc = shared.rpc.stats
+    with sqlite3.connect(run_jobs.RUN_HISTORY_DB) as db:  # critical path up to the first export_data
+        pre_export = db.execute("SELECT MIN(started) FROM stages WHERE stage = 'export' "
+                                "AND run_id = (SELECT MAX(id) FROM runs)").fetchone()[0]
+    stage = lambda *methods: round(sum(rpc.get(m, {}).get("seconds", 0.0) for m in methods), 3)
+    out = {
+        "ok": all(r["ok"] for r in results),
+        "rows": sum(r["rows"] for r in results),
+        "wall_s": round(wall, 3),
+        "connect_s": round(t_connect, 3),
+        # RPC time summed over threads, per pipeline stage
+        "login_s": stage("authenticate", "get_session_info"),
+        "metadata_s": stage("fields_get", "read", "search_read"),
+        "search_s": stage("search"),
+        "pre_export_s": pre_export or 0.0,
+        "export_s": stage("export_data", "export_csv", "csrf_token"),
+        "odoo_bytes_in": sum(st["bytes_in"] for st in rpc.values()),
+        "odoo_bytes_out": sum(st["bytes_out"] for st in rpc.values()),
+        "peak_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+    print("BENCH " + json.dumps(out), flush=True)
+
+
+def run_child(odoo_url, sheets_url, workdir, engine, jobs):
+    cmd = [sys.executable, __file__, "--child", odoo_url, sheets_url, workdir, engine, *jobs]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
+    line = next((l for l in proc.stdout.splitlines() if l.startswith("BENCH ")), None)
+    if proc.returncode or not line or not json.loads(line[6:])["ok"]:
+        raise RuntimeError(f"benchmark run failed:\n{proc.stdout[-2000:]}\n{proc.stderr[-2000:]}")
+    return json.loads(line[6:])
+
+
+# =========================
+# Parent: scenarios + report
+# =========================
+def scenario(n_rows, engine, args):
+    odoo, odoo_port = start_server("fake_odoo.py", "--rows", n_rows, "--latency-ms", args.latency_ms,
+                                   "--row-cost-us", args.row_cost_us)
+    sheets, sheets_port = start_server("fake_sheets.py", "--latency-ms", args.sheets_latency_ms)
+    odoo_url, sheets_url = f"http://127.0.0.1:{odoo_port}", f"http://127.0.0.1:{sheets_port}"
+    try:
+        out = {}
+        with tempfile.TemporaryDirectory() as workdir:
+            for phase in ("cold", "warm"):
+                before = fetch_stats(sheets_url)
+                res = run_child(odoo_url, sheets_url, workdir, engine, args.jobs)
+                after = fetch_stats(sheets_url)
+                res["sheets_requests"] = after["requests"] - before["requests"]
+                res["sheets_bytes_out"] = after["bytes_in"] - before["bytes_in"]  # client → Sheets
+                out[phase] = res
+        return out
+    finally:
+        odoo.kill()
+        sheets.kill()
+
+
+def report(results):
+    cols = ("wall_s", "connect_s", "login_s", "metadata_s", "search_s", "pre_export_s",
+            "export_s", "peak_mb", "odoo_bytes_in", "sheets_requests", "sheets_bytes_out")
+    print(f"{'scenario':<20}" + "".join(f"{c:>17}" for c in cols))
+    for key, res in results.items():
+        print(f"{key:<20}" + "".join(f"{res[c]:>17,}" if isinstance(res[c], int) else f"{res[c]:>17}" for c in cols))
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for key, res in results.items():
+        base = baseline.get(key)
+        if not base:
+            continue
+        for m in REGRESSION_METRICS:
+            if base.get(m) and res[m] > base[m] * (1 + threshold):
+                regressions.append(f"{key} {m}: {base[m]} → {res[m]} (+{(res[m] / base[m] - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline benchmark of run_jobs.py")
+    ap.add_argument("--child", nargs="+", help=argparse.SUPPRESS)
+    ap.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    ap.add_argument("--jobs", nargs="*", default=["zipper", "metal"])
+    ap.add_argument("--engines", nargs="+", default=["json"], choices=["json", "csv", "json-list"],
+                    help="export engines to compare (job 'engine' setting; json-list = json with stream off)")
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="fake Odoo latency per request")
+    ap.add_argument("--row-cost-us", type=float, default=5.0, help="fake Odoo export cost per record")
+    ap.add_argument("--sheets-latency-ms", type=float, default=50.0)
+    ap.add_argument("--save", help="write results as JSON (e.g. a new baseline)")
+    ap.add_argument("--baseline", help="compare against a saved JSON and exit 1 on regression")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    args = ap.parse_args()
+
+    if args.child:
+        odoo_url, sheets_url, workdir, engine, *jobs = args.child
+        return child(odoo_url, sheets_url, workdir, engine, jobs)
+
+    results = {}
+    for n in args.rows:
+        for engine in args.engines:
+            print(f"== {n:,} records, {engine} engine", flush=True)
+            for phase, res in scenario(n, engine, args).items():
+                results[f"{n}/{engine}/{phase}"] = res
+    report(results)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        if regressions:
+            print("❌ Regressions:\n  " + "\n  ".join(regressions))
+            sys.exit(1)
+        print("✅ No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+# =========================
+# In-page probes
+# =========================
+# Counts in-flight XHR/fetch requests of the page. Installed through CDP
+# (Page.addScriptToEvaluateOnNewDocument) so it is in place before Odoo's own
+# scripts run, on every page the browser navigates to.
+NETWORK_HOOK_JS = r"""
+(() => {
+  if (window.__ready) return;
+  const r = window.__ready = {doc: Math.random().toString(36).slice(2), pending: 0, started: 0, last: Date.now()};
+  const begin = () => { r.pending++; r.started++; r.last = Date.now(); };
+  const end = () => { r.pending = Math.max(0, r.pending - 1); r.last = Date.now(); };
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    begin();
+    this.addEventListener('loadend', end, {once: true});
+    return send.apply(this, arguments);
+  };
+  if (window.fetch) {
+    const fetch = window.fetch;
+    window.fetch = function () {
+      begin();
+      return fetch.apply(this, arguments).finally(end);
+    };
+  }
+})();
+"""
+
+# One round trip returns everything the conditions look at
+STATE_JS = NETWORK_HOOK_JS + r"""
+const r = window.__ready, q = (s) => document.querySelector(s);
+const text = (s) => ((q(s) || {}).textContent || '').trim();
+return {
+  doc: r.doc, pending: r.pending, started: r.started, idle_ms: Date.now() - r.last,
+  complete: document.readyState === 'complete',
+  loading: !!q('.o_loading, .o_loading_indicator, .o_blockUI, .blockUI, .o_blockui'),
+  login_form: !!q('input[name="login"]'),
+  rows: document.querySelectorAll('.o_list_view tbody tr.o_data_row, .o_list_renderer tbody tr.o_data_row').length,
+  empty: !!q('.o_view_nocontent'),
+  pager: text('.o_pager_counter'),
+  selection: text('.o_list_selection_box'),
+};
+"""
+
+
+class Readiness:
+    """
+    Waits for Odoo to actually be ready instead of sleeping a worst-case guess.
+
+    A step is ready when the page has no loading indicator / blockUI, no
+    XHR/fetch request is in flight (network idle for 'quiet_ms'), and the
+    step's own condition holds (list rows rendered, counter changed, …).
+    Every step has its own deadline; the time each one really waited is kept
+    in 'timings' and printed by summary().
+    """
+
+    def __init__(self, driver, quiet_ms: int = 500, poll: float = 0.1, grace: float = 1.5, log=log):
+        self.driver = driver
+        self.quiet_ms = quiet_ms
+        self.poll = poll
+        self.grace = grace  # time allowed for an action to start its first request
+        self.log = log
+        self.timings = []  # (step, seconds waited, ok)
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": NETWORK_HOOK_JS})
+        except (WebDriverException, AttributeError):
+            # No CDP (non-Chromium driver): the hook is injected on the first probe instead
+            self.log("ℹ️ CDP unavailable; network hook installed per page")
+
+    def state(self) -> dict:
+        return self.driver.execute_script(STATE_JS)
+
+    def mark(self) -> dict:
+        """Snapshot taken right before an action; settle() then waits for what the action started."""
+        s = self.state()
+        s["at"] = time.monotonic()
+        return s
+
+    def _record(self, step, start, ok):
+        waited = time.monotonic() - start
+        self.timings.append((step, waited, ok))
+        self.log(f"{'⏱️' if ok else '⌛'} {step}: {'ready after' if ok else 'not ready after'} {waited:.1f}s")
+        return waited
+
+    def until(self, step: str, condition, timeout: float):
+        """WebDriverWait(condition) with the wait recorded under 'step'."""
+        start = time.monotonic()
+        try:
+            value = WebDriverWait(self.driver, timeout, poll_frequency=self.poll).until(condition)
+        except TimeoutException:
+            self._record(step, start, False)
+            raise TimeoutError(f"'{step}' not ready within {timeout:.0f}s")
+        self._record(step, start, True)
+        return value
+
+    def settle(self, step: str, mark: dict = None, timeout: float = 60, ready=None):
+        """
+        Wait until the page is idle and 'ready(state)' (optional) is true.
+        With a 'mark', the action must first have started a request or loaded a
+        new page, unless nothing happened within 'grace' seconds.
+        """
+        start = time.monotonic()
+        deadline = start + timeout
+        s = {}
+        while time.monotonic() < deadline:
+            try:
+                s = self.state()
+            except WebDriverException:
+                s = {}  # page is navigating
+            if s:
+                acted = (mark is None or s["doc"] != mark["doc"] or s["started"] > mark["started"]
+                         or time.monotonic() - mark["at"] > self.grace)
+                idle = s["complete"] and not s["loading"] and s["pending"] == 0 and s["idle_ms"] >= self.quiet_ms
+                if acted and idle and (ready is None or ready(s)):
+                    self._record(step, start, True)
+                    return s
+            time.sleep(self.poll)
+        self._record(step, start, False)
+        raise TimeoutError(f"'{step}' not ready within {timeout:.0f}s "
+                           f"(pending={s.get('pending')}, loading={s.get('loading')}, rows={s.get('rows')})")
+
+    # ---- Odoo conditions ----
+    def logged_in(self, mark=None, timeout: float = 60):
+        return self.settle("login", mark, timeout, ready=lambda s: not s["login_form"])
+
+    def list_loaded(self, step: str, mark=None, timeout: float = 180):
+        """List view rendered: data rows, or the 'no records' helper."""
+        return self.settle(step, mark, timeout, ready=lambda s: s["empty"] or s["rows"] > 0)
+
+    def changed(self, step: str, key: str, mark: dict, timeout: float = 60):
+        """
+        Wait until state[key] (e.g. 'pager', 'selection') differs from its value in
+        'mark'. If the element was not found at all (other Odoo version), only waits
+        for the page to settle.
+        """
+        before = mark.get(key)
+        return self.settle(step, mark, timeout, ready=lambda s: not before or (s[key] and s[key] != before))
+
+    def summary(self):
+        total = sum(w for _, w, _ in self.timings)
+        self.log(f"Readiness waits: {total:.1f}s total — " +
+                 ", ".join(f"{step} {w:.1f}s{'' if ok else ' (timeout)'}" for step, w, ok in self.timings))
@@ -0,0 +1,133 @@
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.chrome.service import Service
+
+from odoo_rpc import OdooRpc
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+# =========================
+# CONFIG (environment)
+# =========================
+# CHROMEDRIVER_PATH        pinned chromedriver binary; unset = Selenium Manager, which resolves the
+#                          driver matching the installed Chrome once and caches it in ~/.cache/selenium
+# CHROME_VERSION           pin Chrome itself (Chrome for Testing, fetched and cached by Selenium Manager)
+# CHROME_DEBUGGER_ADDRESS  host:port of a long-lived Chrome started with --remote-debugging-port;
+#                          the scripts attach to it instead of starting a browser
+# CHROME_PROFILE_DIR       persistent profile root (default .cache/chrome-profile); each script gets
+#                          its own sub-directory so they can run at the same time
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+CHROME_VERSION = os.getenv("CHROME_VERSION")
+CHROME_DEBUGGER_ADDRESS = os.getenv("CHROME_DEBUGGER_ADDRESS")
+CHROME_PROFILE_DIR = os.getenv("CHROME_PROFILE_DIR", ".cache/chrome-profile")
+
+SESSION_CACHE = ".cache/odoo_session.json"  # same file run_jobs.py uses
+
+
+def chrome_service() -> Service:
+    """The pinned driver when configured, else Selenium Manager's cached one (no webdriver_manager download)."""
+    if CHROMEDRIVER_PATH:
+        return Service(executable_path=CHROMEDRIVER_PATH)
+    return Service()
+
+
+class BrowserSession:
+    """
+    Chrome for the export scripts, started as warm as possible.
+
+    - Attaches to a running Chrome when CHROME_DEBUGGER_ADDRESS is set (no
+      start-up at all; close() leaves that browser running).
+    - Otherwise starts Chrome on a persistent profile per script, so Odoo's
+      assets come from the HTTP cache on every run after the first.
+    - login() gets an Odoo session over plain HTTP (OdooRpc, reusing the cached
+      session_id) and sets it as the browser's session_id cookie through CDP,
+      which skips the login form; the form stays the fallback.
+    """
+
+    def __init__(self, name: str, download_dir, headless: bool = True, log=log):
+        self.name = name
+        self.download_dir = Path(download_dir).resolve()
+        self.headless = headless
+        self.log = log
+        self.attached = bool(CHROME_DEBUGGER_ADDRESS)
+        self.driver = None
+
+    def _options(self):
+        options = webdriver.ChromeOptions()
+        if self.attached:
+            options.debugger_address = CHROME_DEBUGGER_ADDRESS
+            return options
+        if CHROME_VERSION:
+            options.browser_version = CHROME_VERSION
+        profile = Path(CHROME_PROFILE_DIR, self.name).resolve()
+        profile.mkdir(parents=True, exist_ok=True)
+        options.add_argument(f"--user-data-dir={profile}")
+        if self.headless:
+            options.add_argument("--headless=new")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--no-first-run")
+        options.add_argument("--hide-crash-restore-bubble")
+        options.add_experimental_option("prefs", {
+            "download.default_directory": str(self.download_dir),
+            "download.prompt_for_download": False,
+            "safebrowsing.enabled": True,
+        })
+        return options
+
+    def start(self):
+        start = time.monotonic()
+        self.driver = webdriver.Chrome(service=chrome_service(), options=self._options())
+        how = f"attached to {CHROME_DEBUGGER_ADDRESS}" if self.attached else "started"
+        self.log(f"⏱️ Chrome {how} in {time.monotonic() - start:.1f}s")
+        # Download prefs do not apply to an attached browser; CDP covers both cases
+        try:
+            self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {
+                "behavior": "allow", "downloadPath": str(self.download_dir)})
+        except WebDriverException as e:
+            self.log(f"CDP download path skipped ({e})")
+        return self.driver
+
+    def login(self, url: str, db: str, username: str, password: str, ready, timeout: float = 60) -> bool:
+        """
+        Open Odoo already logged in. Returns False when the page still shows the
+        login form (cookie unavailable or refused); the caller then submits it.
+        """
+        url = url.rstrip("/")
+        try:
+            rpc = OdooRpc(url)
+            rpc.login(db, username, password, session_cache=SESSION_CACHE)
+            sid = rpc.session.cookies.get("session_id")
+            if not sid:
+                raise RuntimeError("no session_id cookie")
+            self.driver.execute_cdp_cmd("Network.setCookie", {
+                "name": "session_id", "value": sid, "url": url + "/", "path": "/", "httpOnly": True})
+        except Exception as e:
+            self.log(f"ℹ️ Session cookie unavailable ({e}); using the login form")
+            self.driver.get(url)
+            return False
+        self.driver.get(url + "/web")
+        s = ready.settle("cookie_login", timeout=timeout)
+        if s["login_form"]:
+            self.log("ℹ️ Odoo refused the session cookie; using the login form")
+            return False
+        self.log(f"🔑 Logged in with the session cookie (uid={rpc.uid})")
+        return True
+
+    def close(self):
+        if not self.driver:
+            return
+        if self.attached:
+            self.driver.service.stop()  # end our driver only; the shared browser keeps running
+        else:
+            self.driver.quit()
+        self.driver = None
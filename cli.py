@@ -0,0 +1,90 @@
+"""
+Single entry point for the export jobs.
+
+    python cli.py rpc [job ...]                        # Odoo JSON-RPC export -> Sheets (run_jobs.py)
+    python cli.py browser zipper|metal                 # Selenium export (Zipper.py / Metal.py) -> Sheets
+    python cli.py upload FILE --sheet "Zipper Raw"     # upload a saved export file only, no Odoo
+    python cli.py daemon start|run|status|stop [job ...]  # scheduler keeping sessions warm (daemon.py)
+
+Only argparse is imported up front; each subcommand imports what its own code
+path needs (no selenium on the RPC path, no pandas/pyarrow unless a feature
+uses them). bench/bench_importtime.py keeps an eye on that.
+"""
+import argparse
+import sys
+
+
+def cmd_rpc(args):
+    import run_jobs
+    return run_jobs.main(args.jobs)
+
+
+def cmd_browser(args):
+    if args.job == "zipper":
+        import Zipper
+        return 0 if Zipper.main() else 1
+    import Metal
+    Metal.main()
+    return 0
+
+
+def cmd_upload(args):
+    from pathlib import Path
+    import run_jobs
+    from xlsx_ingest import read_export
+
+    header, rows = read_export(args.file, Path(args.file).suffix, ncols=args.columns, log=run_jobs.log)
+    run_jobs.upload_export(header, rows, args.sheet, args.url or run_jobs.GOOGLE_SHEET_URL,
+                           width=args.columns, log=run_jobs.log)
+    return 0
+
+
+def cmd_daemon(args):
+    import json
+    import daemon
+
+    if args.action == "start":
+        daemon.Daemon().serve()
+        return 0
+    command = " ".join(["run", *args.jobs]) if args.action == "run" else args.action
+    try:
+        reply = daemon.send(command)
+    except OSError as e:
+        raise SystemExit(f"No daemon listening ({e}); start one with: python cli.py daemon start")
+    print(json.dumps(reply, indent=1))
+    return 1 if "error" in reply else 0
+
+
+def build_parser():
+    ap = argparse.ArgumentParser(prog="cli.py", description="Odoo → Google Sheets export jobs")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    rpc = sub.add_parser("rpc", help="export over JSON-RPC and upload (every job when none are named)")
+    rpc.add_argument("jobs", nargs="*")
+    rpc.set_defaults(func=cmd_rpc)
+
+    browser = sub.add_parser("browser", help="export through the Odoo UI with Chrome and upload")
+    browser.add_argument("job", choices=["zipper", "metal"])
+    browser.set_defaults(func=cmd_browser)
+
+    upload = sub.add_parser("upload", help="upload an export file (.xlsx/.xls/.csv) without Odoo")
+    upload.add_argument("file")
+    upload.add_argument("--sheet", required=True, help="worksheet title, e.g. 'Zipper Raw'")
+    upload.add_argument("--url", help="spreadsheet URL (default: run_jobs.GOOGLE_SHEET_URL)")
+    upload.add_argument("--columns", type=int, default=10, help="first N columns (default 10 = A:J)")
+    upload.set_defaults(func=cmd_upload)
+
+    dmn = sub.add_parser("daemon", help="scheduler that keeps Odoo/Sheets sessions warm between runs")
+    dmn.add_argument("action", choices=["start", "run", "status", "stop"])
+    dmn.add_argument("jobs", nargs="*", help="jobs for 'run' (default: all)")
+    dmn.set_defaults(func=cmd_daemon)
+    return ap
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+"""
+Long-running export scheduler: one process that keeps the Odoo session, the
+Sheets client (access token, sheet metadata) and the preset metadata warm
+between runs, so a scheduled run only moves data.
+
+    python cli.py daemon start            # serve: internal schedule + trigger socket
+    python cli.py daemon run [job ...]    # on-demand run through the socket
+    python cli.py daemon status
+    python cli.py daemon stop
+
+The schedule is the one of .github/workflows/auto_rum.yml, in Dhaka time, with
+a random delay of up to JITTER_S seconds. A job still running when its next run
+is due (or triggered) is skipped rather than started twice.
+"""
+import json
+import os
+import random
+import signal
+import socket
+import socketserver
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import run_jobs
+from run_jobs import log
+
+# =========================
+# CONFIG
+# =========================
+SCHEDULE = ["00:00", "12:30", "13:00", "13:30", "14:00"]  # local times in run_jobs.TZ
+JITTER_S = 90                      # random delay added to every scheduled run
+SOCKET_PATH = ".cache/exportd.sock"  # Unix socket for triggers (owner-only)
+TCP_PORT = 8765                    # 127.0.0.1 port used where Unix sockets are unavailable
+CHECK_EVERY_S = 60                 # wake-up interval while waiting (survives suspend / clock jumps)
+
+
+def next_due(now: datetime, schedule=SCHEDULE) -> datetime:
+    """First scheduled time strictly after 'now' (aware datetime, same zone)."""
+    times = sorted(datetime.strptime(t, "%H:%M").time() for t in schedule)
+    for day in (0, 1):
+        date = (now + timedelta(days=day)).date()
+        for t in times:
+            due = datetime.combine(date, t, tzinfo=now.tzinfo)
+            if due > now:
+                return due
+    raise ValueError("empty schedule")
+
+
+# =========================
+# Daemon
+# =========================
+class Daemon:
+    def __init__(self, jobs=None, schedule=SCHEDULE, jitter: float = JITTER_S, tz: str = run_jobs.TZ):
+        self.jobs = {j["name"]: j for j in (jobs if jobs is not None else run_jobs.JOBS)}
+        self.schedule = schedule
+        self.jitter = jitter
+        self.tz = ZoneInfo(tz)
+        self.locks = {name: threading.Lock() for name in self.jobs}
+        self.shared = None
+        self.next_run = None
+        self.last = {}  # job name -> result of its last run
+        self.stopping = threading.Event()
+        self._connect_lock = threading.Lock()
+        self._active = 0
+        self._active_lock = threading.Lock()
+
+    def _shared(self) -> "run_jobs.Shared":
+        """Log in on first use; afterwards the same session (re-login on expiry is OdooRpc's job)."""
+        with self._connect_lock:
+            if self.shared is None:
+                self.shared = run_jobs.connect()
+            return self.shared
+
+    def trigger(self, names=None, source: str = "schedule") -> dict:
+        """Start 'names' (default: every job) in the background; jobs still running are skipped."""
+        names = list(names or self.jobs)
+        unknown = [n for n in names if n not in self.jobs]
+        if unknown:
+            return {"error": f"unknown job(s): {', '.join(unknown)}"}
+        started = [n for n in names if self.locks[n].acquire(blocking=False)]
+        busy = [n for n in names if n not in started]
+        if busy:
+            log(f"⏭️ {', '.join(busy)} still running; not started again ({source})")
+        if started:
+            threading.Thread(target=self._run, args=(started, source), daemon=True).start()
+        return {"started": started, "busy": busy}
+
+    def _run(self, names, source):
+        with self._active_lock:
+            self._active += 1
+            first = self._active == 1
+        try:
+            log(f"▶️ {source} run: {', '.join(names)}")
+            shared = self._shared()
+            if first:
+                shared.rpc.reset_stats()  # the summary run() prints then covers this run only
+                shared.forget_presets()
+            results = run_jobs.run([self.jobs[n] for n in names], shared)
+            finished = datetime.now(self.tz).isoformat(timespec="seconds")
+            for r in results:
+                self.last[r["name"]] = {**r, "finished": finished, "source": source}
+        except Exception as e:
+            log(f"❌ {source} run failed: {e}")
+            for n in names:
+                self.last[n] = {"name": n, "ok": False, "error": str(e), "source": source,
+                                "finished": datetime.now(self.tz).isoformat(timespec="seconds")}
+        finally:
+            for n in names:
+                self.locks[n].release()
+            with self._active_lock:
+                self._active -= 1
+
+    def status(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "connected": self.shared is not None,
+            "next_run": self.next_run.isoformat(timespec="seconds") if self.next_run else None,
+            "running": [n for n, lock in self.locks.items() if lock.locked()],
+            "last": self.last,
+        }
+
+    # ---- trigger socket ----
+    def handle(self, line: str) -> dict:
+        cmd, *args = line.split() or [""]
+        if cmd == "run":
+            return self.trigger(args, source="socket")
+        if cmd == "status":
+            return self.status()
+        if cmd == "stop":
+            self.stopping.set()
+            return {"stopping": True}
+        return {"error": f"unknown command '{cmd}' (run [job ...] | status | stop)"}
+
+    def _listen(self):
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                line = self.rfile.readline(4096).decode("utf-8", "replace").strip()
+                self.wfile.write((json.dumps(daemon.handle(line)) + "\n").encode("utf-8"))
+
+        if hasattr(socket, "AF_UNIX"):
+            path = Path(SOCKET_PATH)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            if path.exists():
+                try:
+                    send("status", timeout=2)
+                    raise RuntimeError(f"Another daemon is listening on {path}")
+                except OSError:
+                    path.unlink()  # left over from a daemon that did not shut down
+            server = socketserver.ThreadingUnixStreamServer(str(path), Handler)
+            os.chmod(path, 0o600)
+            log(f"Listening for triggers on {path}")
+        else:
+            server = socketserver.ThreadingTCPServer(("127.0.0.1", TCP_PORT), Handler)
+            log(f"Listening for triggers on 127.0.0.1:{TCP_PORT}")
+        server.daemon_threads = True
+        return server
+
+    # ---- main loop ----
+    def serve(self):
+        server = self._listen()
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: self.stopping.set())
+        try:
+            try:
+                self._shared()  # log in and fetch the Google token now, not at the first run
+            except Exception as e:
+                log(f"⚠️ Warm-up login failed ({e}); retrying at the first run")
+            while not self.stopping.is_set():
+                now = datetime.now(self.tz)
+                self.next_run = next_due(now, self.schedule) + timedelta(seconds=random.uniform(0, self.jitter))
+                log(f"⏰ Next run at {self.next_run:%Y-%m-%d %H:%M:%S} ({self.tz.key})")
+                while not self.stopping.is_set():
+                    remaining = (self.next_run - datetime.now(self.tz)).total_seconds()
+                    if remaining <= 0:
+                        self.trigger(source="schedule")
+                        break
+                    self.stopping.wait(min(remaining, CHECK_EVERY_S))
+        finally:
+            log("Stopping: waiting for running jobs…")
+            for lock in self.locks.values():
+                with lock:
+                    pass
+            server.shutdown()
+            server.server_close()
+            if hasattr(socket, "AF_UNIX"):
+                Path(SOCKET_PATH).unlink(missing_ok=True)
+            log("Daemon stopped.")
+
+
+# =========================
+# Client side (cli.py daemon run|status|stop)
+# =========================
+def send(command: str, timeout: float = 10) -> dict:
+    if hasattr(socket, "AF_UNIX"):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        address = SOCKET_PATH
+    else:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        address = ("127.0.0.1", TCP_PORT)
+    with sock:
+        sock.settimeout(timeout)
+        sock.connect(address)
+        sock.sendall((command + "\n").encode("utf-8"))
+        return json.loads(sock.makefile("rb").readline())
@@ -0,0 +1,162 @@
+import ctypes
+import ctypes.util
+import fnmatch
+import os
+import select
+import struct
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+# =========================
+# inotify (Linux) through ctypes
+# =========================
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO    = 0x00000080
+IN_NONBLOCK    = 0o4000
+IN_CLOEXEC     = 0o2000000
+EVENT_HEADER   = struct.Struct("iIII")  # wd, mask, cookie, len (+ name, NUL-padded)
+
+# Chrome writes "<name>.crdownload" (or a hidden temp file) and renames it when done
+PARTIAL_SUFFIXES = (".crdownload", ".part", ".tmp")
+
+
+def _libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    return libc if hasattr(libc, "inotify_init1") and hasattr(libc, "inotify_add_watch") else None
+
+
+def is_partial(name: str) -> bool:
+    return name.startswith(".") or name.endswith(PARTIAL_SUFFIXES)
+
+
+class DownloadWatcher:
+    """
+    Reports the file a browser download produces, the moment it is complete.
+
+    Start it before clicking the download (it only reports files finished after
+    that). On Linux it listens to inotify IN_CLOSE_WRITE / IN_MOVED_TO events of
+    the download directories, so nothing is rescanned and Chrome's final rename
+    of the .crdownload file is seen immediately. Elsewhere (or if inotify is
+    unavailable) it falls back to polling the directories.
+
+        with DownloadWatcher([download_dir], pattern="*.xlsx") as watcher:
+            button.click()
+            path = watcher.wait(timeout=180)
+    """
+
+    def __init__(self, dirs, pattern: str = "*", poll: float = 0.25, log=log):
+        self.dirs = [Path(d).resolve() for d in dirs]
+        self.pattern = pattern
+        self.poll = poll
+        self.log = log
+        self._fd = None
+        self._wd = {}
+        self._before = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _wanted(self, name: str) -> bool:
+        return not is_partial(name) and fnmatch.fnmatch(name, self.pattern)
+
+    def start(self):
+        libc = _libc()
+        if libc is not None:
+            fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            if fd >= 0:
+                for d in self.dirs:
+                    if not d.is_dir():
+                        continue
+                    wd = libc.inotify_add_watch(fd, os.fsencode(d), IN_CLOSE_WRITE | IN_MOVED_TO)
+                    if wd >= 0:
+                        self._wd[wd] = d
+                if self._wd:
+                    self._fd = fd
+                    return self
+                os.close(fd)
+        self.log("ℹ️ inotify unavailable; watching downloads by polling")
+        self._before = self._scan()
+        return self
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    # ---- polling fallback ----
+    def _scan(self) -> dict:
+        seen = {}
+        for d in self.dirs:
+            try:
+                with os.scandir(d) as it:
+                    for e in it:
+                        if e.is_file() and self._wanted(e.name):
+                            seen[e.path] = e.stat().st_mtime_ns
+            except OSError:
+                continue
+        return seen
+
+    def _poll_once(self):
+        now = self._scan()
+        fresh = [p for p, mtime in now.items() if self._before.get(p) != mtime]
+        if not fresh:
+            return None
+        path = Path(max(fresh, key=now.get))
+        if path.with_name(path.name + ".crdownload").exists():
+            return None
+        return path
+
+    # ---- inotify ----
+    def _read_events(self, timeout: float):
+        r, _, _ = select.select([self._fd], [], [], max(0.0, timeout))
+        if not r:
+            return None
+        try:
+            buf = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return None
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, pos)
+            pos += EVENT_HEADER.size
+            name = os.fsdecode(buf[pos:pos + length].rstrip(b"\0"))
+            pos += length
+            if name and wd in self._wd and self._wanted(name):
+                return self._wd[wd] / name
+        return None
+
+    def wait(self, timeout: float = 180) -> Path:
+        """Block until a matching file is complete; returns its path."""
+        start = time.monotonic()
+        deadline = start + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            if self._fd is not None:
+                path = self._read_events(remaining)
+            else:
+                path = self._poll_once()
+                if path is None:
+                    time.sleep(min(self.poll, remaining))
+            if path is not None and path.exists():
+                self.log(f"⏱️ download: {path.name} complete after {time.monotonic() - start:.1f}s")
+                return path
+        where = ", ".join(map(str, self.dirs))
+        raise TimeoutError(f"No completed download matching '{self.pattern}' in {where} within {timeout:.0f}s")
@@ -0,0 +1,151 @@
+import base64
+import io
+import time
+from datetime import datetime
+
+from selenium.common.exceptions import WebDriverException
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+# =========================
+# In-page hook
+# =========================
+# Odoo fetches /web/export/xlsx (or /csv) with an XHR and hands the blob to an
+# <a download> click. While armed, the hook keeps a base64 copy of that response
+# in window.__exportCapture; Chrome's own download is denied through CDP, so
+# nothing touches the disk.
+CAPTURE_HOOK_JS = r"""
+(() => {
+  if (window.__exportCaptureHook) return;
+  window.__exportCaptureHook = true;
+  const match = (url) => String(url || '').indexOf('/web/export/') !== -1;
+  const keep = (blob, name) => {
+    const c = window.__exportCapture;
+    const reader = new FileReader();
+    reader.onload = () => {
+      const s = String(reader.result);
+      c.b64 = s.slice(s.indexOf(',') + 1);
+      c.name = name; c.size = blob.size; c.state = 'done';
+    };
+    reader.onerror = () => { c.state = 'error'; c.error = String(reader.error); };
+    reader.readAsDataURL(blob);
+  };
+  const filename = (disposition) => {
+    const m = /filename\*?=(?:UTF-8'')?"?([^";]+)"?/i.exec(disposition || '');
+    return m ? decodeURIComponent(m[1]) : '';
+  };
+  const armed = () => window.__exportCapture && window.__exportCapture.state === 'armed';
+
+  const open = XMLHttpRequest.prototype.open;
+  XMLHttpRequest.prototype.open = function (method, url) {
+    this.__captureUrl = url;
+    return open.apply(this, arguments);
+  };
+  const send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    if (match(this.__captureUrl) && armed()) {
+      const c = window.__exportCapture;
+      c.state = 'pending';
+      this.addEventListener('loadend', () => {
+        if (this.status !== 200) { c.state = 'error'; c.error = 'HTTP ' + this.status; return; }
+        const body = this.response instanceof Blob ? this.response : new Blob([this.response]);
+        keep(body, filename(this.getResponseHeader('Content-Disposition')));
+      }, {once: true});
+    }
+    return send.apply(this, arguments);
+  };
+  if (window.fetch) {
+    const fetch = window.fetch;
+    window.fetch = function (input) {
+      const url = typeof input === 'string' ? input : (input && input.url);
+      const p = fetch.apply(this, arguments);
+      if (match(url) && armed()) {
+        const c = window.__exportCapture;
+        c.state = 'pending';
+        p.then((r) => r.ok ? r.clone().blob().then((b) => keep(b, filename(r.headers.get('Content-Disposition'))))
+                           : (c.state = 'error', c.error = 'HTTP ' + r.status))
+         .catch((e) => { c.state = 'error'; c.error = String(e); });
+      }
+      return p;
+    };
+  }
+})();
+"""
+
+READ_CHUNK = 4 * 1024 * 1024  # base64 characters per WebDriver round trip
+
+
+class CapturedExport:
+    def __init__(self, data: bytes, name: str):
+        self.data = data
+        self.name = name or "export.xlsx"
+
+    @property
+    def suffix(self) -> str:
+        return "." + self.name.rsplit(".", 1)[-1].lower() if "." in self.name else ".xlsx"
+
+    def open(self):
+        return io.BytesIO(self.data)
+
+
+class ExportCapture:
+    """
+    Captures the Odoo export file in memory instead of letting Chrome save it.
+
+    Create it before the first driver.get() so the hook is on every page. Call
+    arm() right before clicking the export button and wait() afterwards: it
+    returns a CapturedExport, or None when the page did not fetch the export
+    with XHR/fetch (older Odoo posting a form). In that case release() allows
+    downloads again so the caller can fall back to the download directory.
+    """
+
+    def __init__(self, driver, log=log):
+        self.driver = driver
+        self.log = log
+        try:
+            driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": CAPTURE_HOOK_JS})
+            self.available = True
+        except (WebDriverException, AttributeError) as e:
+            self.log(f"ℹ️ In-memory export capture unavailable ({e})")
+            self.available = False
+
+    def arm(self):
+        self.driver.execute_cdp_cmd("Browser.setDownloadBehavior", {"behavior": "deny"})
+        self.driver.execute_script(CAPTURE_HOOK_JS + "window.__exportCapture = {state: 'armed'};")
+
+    def release(self, download_dir):
+        self.driver.execute_script("window.__exportCapture = null;")
+        self.driver.execute_cdp_cmd("Browser.setDownloadBehavior",
+                                    {"behavior": "allow", "downloadPath": str(download_dir)})
+
+    def _read(self, size_b64: int) -> bytes:
+        parts = []
+        for i in range(0, size_b64, READ_CHUNK):
+            parts.append(self.driver.execute_script(
+                "return window.__exportCapture.b64.substr(arguments[0], arguments[1]);", i, READ_CHUNK))
+        self.driver.execute_script("window.__exportCapture.b64 = null;")
+        return base64.b64decode("".join(parts))
+
+    def wait(self, timeout: float = 180, start_timeout: float = 15, poll: float = 0.2):
+        """Returns CapturedExport, or None if no export request started within 'start_timeout'."""
+        start = time.monotonic()
+        while time.monotonic() - start < timeout:
+            c = self.driver.execute_script(
+                "const c = window.__exportCapture || {};"
+                "return {state: c.state, name: c.name, size: c.size, error: c.error,"
+                "        b64_len: c.b64 ? c.b64.length : 0};")
+            state = c.get("state")
+            if state == "done":
+                data = self._read(c["b64_len"])
+                self.log(f"⏱️ export captured in memory: {c.get('name') or '?'} "
+                         f"({len(data) / 1024:.0f} KiB) after {time.monotonic() - start:.1f}s")
+                return CapturedExport(data, c.get("name"))
+            if state == "error":
+                raise RuntimeError(f"Export request failed: {c.get('error')}")
+            if state in ("armed", None) and time.monotonic() - start > start_timeout:
+                return None
+            time.sleep(poll)
+        raise TimeoutError(f"Export not received within {timeout:.0f}s")
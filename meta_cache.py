@@ -0,0 +1,110 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+
+# =========================
+# On-disk cache of export preset metadata
+# =========================
+FORMAT = 3  # bump when the cached value layout changes; older entries are reloaded
+
+
+class MetaCache:
+    """
+    Caches the resolved field names and column labels of ir.exports presets in a
+    JSON file, keyed by (model, export id, company context).
+
+    An entry younger than 'ttl' seconds is used as is. An older entry is checked
+    with two cheap search_reads (write_date of the ir.exports record, ids +
+    write_date of its lines): if both are unchanged the entry is kept, otherwise
+    the preset is reloaded. Labels and types come from fields_get, which no
+    write_date covers, so an entry loaded more than 'fields_ttl' seconds ago is
+    reloaded regardless.
+    """
+
+    def __init__(self, path, ttl: float = 6 * 3600, fields_ttl: float = 24 * 3600):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.fields_ttl = fields_ttl
+        self._lock = threading.Lock()
+        try:
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self._data = {}
+
+    @staticmethod
+    def key(model, export_id, ctx) -> str:
+        companies = ",".join(map(str, ctx.get("allowed_company_ids") or []))
+        return f"{model}|{export_id}|{companies}|{ctx.get('lang', '')}"
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(self._data, indent=1), encoding="utf-8")
+        tmp.replace(self.path)
+
+    @staticmethod
+    def lines_signature(aio, export_id, ctx):
+        """write_date of the preset record plus [id, write_date] of each of its lines (one round trip)."""
+        async def preset(_):
+            return await aio.call_kw("ir.exports", "search_read", args=[[["id", "=", export_id]]],
+                                     kwargs={"fields": ["write_date"], "context": ctx})
+
+        async def lines(_):
+            return await aio.call_kw("ir.exports.line", "search_read",
+                                     args=[[["export_id", "=", export_id]]],
+                                     kwargs={"fields": ["write_date"], "order": "id", "context": ctx})
+
+        done = aio.run({"preset": ((), preset), "lines": ((), lines)})
+        return {"preset": done["preset"][0]["write_date"] if done["preset"] else None,
+                "lines": [[l["id"], l["write_date"]] for l in done["lines"]]}
+
+    def get(self, aio, model, export_id, ctx, loader, log=print):
+        """
+        Return the cached value for this preset, or loader() when missing/stale.
+        loader() must return a JSON-serialisable value. 'aio' is the
+        odoo_async.AsyncOdoo the signature lookups go through.
+        """
+        key = self.key(model, export_id, ctx)
+        with self._lock:
+            entry = self._data.get(key)
+
+        if entry and entry.get("format") != FORMAT:
+            entry = None
+
+        if entry and time.time() - entry["checked_at"] < self.ttl:
+            log(f"Preset {export_id}: metadata from cache")
+            return entry["value"]
+
+        sig = None
+        if entry and time.time() - entry["loaded_at"] >= self.fields_ttl:
+            log(f"Preset {export_id}: labels older than {self.fields_ttl / 3600:g}h, reloading")
+        elif entry:
+            sig = self.lines_signature(aio, export_id, ctx)
+            if sig == entry["lines"]:
+                log(f"Preset {export_id}: cache validated (preset and lines unchanged)")
+                with self._lock:
+                    entry["checked_at"] = time.time()
+                    self._save()
+                return entry["value"]
+            log(f"Preset {export_id}: preset or lines changed, reloading")
+
+        if sig is None:
+            sig = self.lines_signature(aio, export_id, ctx)
+        # Signature taken before loading: a preset edited meanwhile is cached under the
+        # older signature and reloaded at the next check, never the other way round
+        value = loader()
+        now = time.time()
+        with self._lock:
+            self._data[key] = {"format": FORMAT, "value": value, "lines": sig, "checked_at": now, "loaded_at": now}
+            self._save()
+        return value
+
+    def invalidate(self, model=None, export_id=None):
+        with self._lock:
+            for k in list(self._data):
+                m, e = k.split("|")[:2]
+                if (model is None or m == model) and (export_id is None or e == str(export_id)):
+                    del self._data[k]
+            self._save()
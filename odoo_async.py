@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+
+# =========================
+# asyncio front-end of OdooRpc
+# =========================
+class AsyncOdoo:
+    """
+    Runs small dependency graphs of Odoo calls: every call whose inputs are
+    ready is in flight at the same time, so independent lookups (preset,
+    preset lines, fields_get, search) cost one round trip instead of one each.
+
+    The calls themselves are OdooRpc.call_kw in worker threads (asyncio.to_thread),
+    so they share its keep-alive pool, retries and stats. At most 'limit' calls
+    of this client are in flight at once, across all graphs and threads, to
+    keep a parallel run from flooding Odoo's workers.
+    """
+
+    def __init__(self, rpc, limit: int = 4):
+        self.rpc = rpc
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+
+    def _call_kw(self, model, method, args, kwargs):
+        with self._slots:
+            return self.rpc.call_kw(model, method, args=args, kwargs=kwargs)
+
+    async def call_kw(self, model, method, args=None, kwargs=None):
+        return await asyncio.to_thread(self._call_kw, model, method, args, kwargs)
+
+    async def call(self, fn, *args):
+        """Blocking step that makes its own calls (not counted against 'limit': it holds no connection)."""
+        return await asyncio.to_thread(fn, *args)
+
+    @staticmethod
+    def check(graph: dict):
+        """Raise ValueError on an unknown dependency or a cycle."""
+        for name, (deps, _) in graph.items():
+            unknown = [d for d in deps if d not in graph]
+            if unknown:
+                raise ValueError(f"'{name}' depends on unknown call(s): {', '.join(unknown)}")
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == "done":
+                return
+            if state.get(name) == "open":
+                raise ValueError(f"dependency cycle: {' -> '.join(path + [name])}")
+            state[name] = "open"
+            for d in graph[name][0]:
+                visit(d, path + [name])
+            state[name] = "done"
+
+        for name in graph:
+            visit(name, [])
+
+    async def gather(self, graph: dict) -> dict:
+        """
+        graph: {name: (dependency names, step)}; step(results) gets the results of
+        its dependencies by name and returns a coroutine. Returns {name: result}.
+        The first failing step cancels the others and its error is raised.
+        """
+        self.check(graph)
+        tasks = {}
+
+        async def node(name):
+            deps, step = graph[name]
+            results = {d: await tasks[d] for d in deps}
+            return await step(results)
+
+        for name in graph:
+            tasks[name] = asyncio.ensure_future(node(name))
+        try:
+            await asyncio.gather(*tasks.values())
+        finally:
+            for t in tasks.values():
+                t.cancel()
+        return {name: t.result() for name, t in tasks.items()}
+
+    def run(self, graph: dict) -> dict:
+        """gather() from synchronous code (a job thread); each call gets its own event loop."""
+        return asyncio.run(self.gather(graph))
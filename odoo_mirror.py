@@ -0,0 +1,140 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+
+# =========================
+# Local SQLite mirror of an export preset
+# =========================
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mirror_meta (
+    scope      TEXT PRIMARY KEY,
+    fields     TEXT NOT NULL,
+    watermark  TEXT,
+    last_full  REAL
+);
+CREATE TABLE IF NOT EXISTS mirror_records (
+    scope      TEXT NOT NULL,
+    id         INTEGER NOT NULL,
+    write_date TEXT,
+    rows       TEXT NOT NULL,
+    PRIMARY KEY (scope, id)
+);
+"""
+
+
+class ExportMirror:
+    """
+    Keeps the export_data rows of one (model, preset, company) scope in SQLite,
+    keyed by record id, with a persisted write_date watermark.
+
+    sync() fetches only records written since the watermark (plus ids the mirror
+    has never seen), drops ids that no longer match the domain and returns the
+    full row set rebuilt from the mirror in search order.
+    """
+
+    def __init__(self, path, scope: str, field_names, full_refresh_hours: float = 24):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(str(path))
+        self.db.executescript(SCHEMA)
+        self.scope = scope
+        self.field_names = list(field_names)
+        self.full_refresh_hours = full_refresh_hours
+
+    def close(self):
+        self.db.close()
+
+    # ---- meta ----
+    def _load_meta(self):
+        row = self.db.execute(
+            "SELECT fields, watermark, last_full FROM mirror_meta WHERE scope = ?", (self.scope,)
+        ).fetchone()
+        fields_sig = json.dumps(self.field_names)
+        if not row or row[0] != fields_sig:
+            # New scope or preset changed: start over
+            with self.db:
+                self.db.execute("DELETE FROM mirror_records WHERE scope = ?", (self.scope,))
+                self.db.execute(
+                    "INSERT OR REPLACE INTO mirror_meta (scope, fields, watermark, last_full) VALUES (?, ?, NULL, NULL)",
+                    (self.scope, fields_sig),
+                )
+            return None, None
+        return row[1], row[2]
+
+    def _known_ids(self):
+        return {r[0] for r in self.db.execute("SELECT id FROM mirror_records WHERE scope = ?", (self.scope,))}
+
+    # ---- sync ----
+    def sync(self, call_kw, model, domain, context, export, log=print):
+        """
+        export(ids, field_names) -> rows, e.g. a single or chunked export_data call.
+        Returns (ids, rows) where rows are in search order.
+        """
+        watermark, last_full = self._load_meta()
+        full = (
+            watermark is None
+            or last_full is None
+            or (self.full_refresh_hours and time.time() - last_full > self.full_refresh_hours * 3600)
+        )
+
+        # Cheap id-only search detects both deletions and records newly matching the domain
+        ids = call_kw(model, "search", args=[domain], kwargs={"context": context})
+        current = set(ids)
+        known = self._known_ids()
+
+        if full:
+            log("Mirror: full refresh")
+            stamps = call_kw(model, "search_read", args=[domain],
+                             kwargs={"fields": ["write_date"], "context": context})
+        else:
+            stamps = call_kw(model, "search_read", args=[domain + [["write_date", ">=", watermark]]],
+                             kwargs={"fields": ["write_date"], "context": context})
+        write_dates = {s["id"]: s["write_date"] for s in stamps}
+        unseen = [i for i in ids if i not in known and i not in write_dates]
+        if unseen:
+            for s in call_kw(model, "read", args=[unseen], kwargs={"fields": ["write_date"], "context": context}):
+                write_dates[s["id"]] = s["write_date"]
+
+        fetch_ids = [i for i in ids if i in write_dates]
+        deleted = known - current
+        log(f"Mirror: {len(fetch_ids)} changed/new, {len(deleted)} removed, {len(ids) - len(fetch_ids)} unchanged")
+
+        grouped = {}
+        if fetch_ids:
+            # Leading '.id' column maps each row (and its one2many continuation rows) to its record
+            rows = export(fetch_ids, [".id"] + self.field_names)
+            current_id = None
+            for row in rows:
+                if row and row[0] not in (None, False, ""):
+                    current_id = int(row[0])
+                grouped.setdefault(current_id, []).append(row[1:])
+
+        new_watermark = max([watermark or ""] + [w for w in write_dates.values() if w]) or None
+        with self.db:
+            if deleted:
+                self.db.executemany(
+                    "DELETE FROM mirror_records WHERE scope = ? AND id = ?",
+                    [(self.scope, i) for i in deleted],
+                )
+            self.db.executemany(
+                "INSERT OR REPLACE INTO mirror_records (scope, id, write_date, rows) VALUES (?, ?, ?, ?)",
+                [(self.scope, i, write_dates.get(i), json.dumps(grouped.get(i, []))) for i in fetch_ids],
+            )
+            self.db.execute(
+                "UPDATE mirror_meta SET watermark = ?, last_full = COALESCE(?, last_full) WHERE scope = ?",
+                (new_watermark, time.time() if full else None, self.scope),
+            )
+
+        return ids, self.rows(ids)
+
+    def rows(self, ids):
+        """Rebuild the export rows for 'ids' (in that order) from the mirror."""
+        by_id = {
+            r[0]: json.loads(r[1])
+            for r in self.db.execute("SELECT id, rows FROM mirror_records WHERE scope = ?", (self.scope,))
+        }
+        out = []
+        for i in ids:
+            out.extend(by_id.get(i, []))
+        return out
@@ -0,0 +1,429 @@
+import contextvars
+import gzip
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import ProtocolError, ReadTimeoutError
+
+from stream_decode import decode_export_stream, decode_export_csv, ColumnBuffers
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+# =========================
+# HTTP session + Odoo RPC
+# =========================
+# (connect, read) timeouts per RPC method; "default" covers everything else
+DEFAULT_TIMEOUTS = {
+    "authenticate": (10, 60),
+    "fields_get":   (10, 30),
+    "search":       (10, 60),
+    "read":         (10, 60),
+    "search_read":  (10, 120),
+    "export_data":  (10, 300),
+    "export_csv":   (10, 300),
+    "default":      (10, 120),
+}
+
+# Read-only calls that are safe to repeat after a timeout / connection drop / 5xx
+IDEMPOTENT = {"authenticate", "get_session_info", "fields_get", "search", "search_count", "read", "search_read",
+              "name_get", "export_data", "export_csv"}
+
+RETRY_STATUS = {429, 502, 503, 504}
+
+# JSON-RPC error names meaning "log in again"
+SESSION_ERRORS = {"odoo.http.SessionExpiredException", "werkzeug.exceptions.Unauthorized"}
+SESSION_EXPIRED = {"code": 100, "message": "Odoo Session Expired"}
+
+# csrf_token of the session as rendered into the /web page (odoo = {csrf_token: "…"})
+CSRF_RE = re.compile(r"""csrf_token["']?\s*:\s*["']([0-9a-zA-Z]+)["']""")
+
+
+def is_session_error(exc) -> bool:
+    """True for a 401 or an Odoo 'Session Expired' JSON-RPC error (code 100)."""
+    if isinstance(exc, requests.HTTPError):
+        return getattr(exc.response, "status_code", None) == 401
+    err = exc.args[0] if exc.args else None
+    if not isinstance(err, dict):
+        return False
+    return err.get("code") == 100 or (err.get("data") or {}).get("name") in SESSION_ERRORS
+
+
+# Traffic of the current stage (see run_history.py). A context variable rather than
+# per-method totals, so jobs running in parallel do not count each other's bytes.
+_meter = contextvars.ContextVar("odoo_rpc_meter", default=None)
+
+
+@contextmanager
+def metered():
+    """Count calls and bytes of every RPC made in this context (and in export workers it starts)."""
+    m = {"calls": 0, "bytes_out": 0, "bytes_in": 0}
+    token = _meter.set(m)
+    try:
+        yield m
+    finally:
+        _meter.reset(token)
+
+
+class OdooRpc:
+    """
+    One authenticated HTTP session to Odoo, shared by every job and thread.
+
+    Transport: keep-alive pool sized for concurrent calls, per-method timeouts,
+    exponential backoff with jitter for idempotent reads, optional gzip of large
+    request bodies, and per-method counters (calls, retries, seconds, bytes).
+    Responses are requested gzip-compressed (Accept-Encoding) by requests itself.
+    """
+
+    def __init__(self, url: str, pool_size: int = 16, timeouts: dict = None,
+                 retries: int = 3, backoff: float = 0.5, gzip_min_bytes: int = None):
+        self.url = url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"})
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self.retries = retries
+        self.backoff = backoff
+        # Request bodies above this size are sent gzip-encoded. Only enable when the server
+        # (or the proxy in front of Odoo) decodes Content-Encoding: gzip on requests.
+        self.gzip_min_bytes = gzip_min_bytes
+        self.uid = None
+        self.user_context = {}
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._login_lock = threading.Lock()
+        self._login_args = None
+        self._session_cache = None
+        self._generation = 0  # bumped on every (re)login
+        self._csrf = None     # (generation, token)
+
+    # ---- transport ----
+    def _count(self, method, **inc):
+        with self._stats_lock:
+            st = self.stats.setdefault(method, {"calls": 0, "retries": 0, "errors": 0,
+                                                "seconds": 0.0, "bytes_out": 0, "bytes_in": 0})
+            for k, v in inc.items():
+                st[k] += v
+            m = _meter.get()
+            if m is not None:
+                for k in m:
+                    m[k] += inc.get(k, 0)
+
+    def _request(self, method, path, payload, consume, stream=False, form=None):
+        """
+        POST a JSON-RPC payload (or a urlencoded 'form' for type="http" routes) and
+        return consume(response), retrying idempotent methods.
+        """
+        if form is not None:
+            body = urlencode(form).encode("utf-8")
+            headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        else:
+            body = json.dumps(payload).encode("utf-8")
+            headers = {"Content-Type": "application/json"}
+        if self.gzip_min_bytes and len(body) >= self.gzip_min_bytes:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+        timeout = self.timeouts.get(method, self.timeouts["default"])
+        attempts = 1 + (self.retries if method in IDEMPOTENT else 0)
+
+        for attempt in range(1, attempts + 1):
+            start = time.monotonic()
+            try:
+                with self.session.post(f"{self.url}{path}", data=body, headers=headers,
+                                       timeout=timeout, stream=stream) as r:
+                    if r.status_code in RETRY_STATUS and attempt < attempts:
+                        raise requests.HTTPError(f"{r.status_code} from {path}", response=r)
+                    r.raise_for_status()
+                    result = consume(r)
+                    received = r.raw.tell() if hasattr(r.raw, "tell") else len(r.content)
+                self._count(method, calls=1, seconds=time.monotonic() - start,
+                            bytes_out=len(body), bytes_in=received)
+                return result
+            # Streamed bodies (export_data_stream, export_csv_stream) are read from r.raw,
+            # where a cut or stalled connection surfaces as urllib3's own exceptions
+            except (requests.ConnectionError, requests.Timeout, requests.HTTPError,
+                    requests.exceptions.ChunkedEncodingError, ProtocolError, ReadTimeoutError) as e:
+                self._count(method, calls=1, errors=1, seconds=time.monotonic() - start, bytes_out=len(body))
+                status = getattr(getattr(e, "response", None), "status_code", None)
+                retryable = status is None or status in RETRY_STATUS
+                if attempt >= attempts or not retryable:
+                    raise
+                delay = self.backoff * (2 ** (attempt - 1)) * (0.5 + random.random())
+                self._count(method, retries=1)
+                log(f"⚠️ {method} failed ({e}); retry {attempt}/{attempts - 1} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def _json_result(r):
+        res = r.json()
+        if "error" in res:
+            raise RuntimeError(res["error"])
+        return res.get("result")
+
+    def stats_summary(self) -> str:
+        with self._stats_lock:
+            items = sorted(self.stats.items())
+        return "\n".join(
+            f"{m:<14} calls={st['calls']:<4} retries={st['retries']:<3} {st['seconds']:7.2f}s "
+            f"out={st['bytes_out'] / 1024:8.1f} KiB in={st['bytes_in'] / 1024:10.1f} KiB"
+            for m, st in items
+        )
+
+    def reset_stats(self):
+        """Start the per-method counters over (a long-lived session reporting per run)."""
+        with self._stats_lock:
+            self.stats = {}
+
+    # ---- RPC ----
+    def login(self, db: str, username: str, password: str, session_cache=None) -> int:
+        """
+        Authenticate, or reuse the session stored in 'session_cache' (a JSON file)
+        when /web/session/get_session_info still accepts it. A fresh login is
+        saved back to the cache. Later session errors trigger one re-login.
+        """
+        self._login_args = (db, username, password)
+        self._session_cache = Path(session_cache) if session_cache else None
+        if self._session_cache and self._resume(db, username):
+            return self.uid
+        return self._authenticate()
+
+    def _authenticate(self) -> int:
+        db, username, password = self._login_args
+        self.session.cookies.clear()
+        res = self._request("authenticate", "/web/session/authenticate", {
+            "jsonrpc": "2.0",
+            "params": {"db": db, "login": username, "password": password}
+        }, lambda r: r.json())
+        info = res.get("result") or {}
+        uid = info.get("uid")
+        if not uid:
+            raise RuntimeError("Login failed")
+        self.uid = uid
+        self.user_context = info.get("user_context") or {}
+        self._generation += 1
+        if self._session_cache:
+            self._save_session(db, username)
+        return uid
+
+    def _resume(self, db, username) -> bool:
+        try:
+            cached = json.loads(self._session_cache.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return False
+        if (cached.get("url"), cached.get("db"), cached.get("login")) != (self.url, db, username):
+            return False
+        self.session.cookies.set("session_id", cached["session_id"], domain=urlparse(self.url).hostname or "")
+        try:
+            info = self._request("get_session_info", "/web/session/get_session_info",
+                                 {"jsonrpc": "2.0", "method": "call", "params": {}}, self._json_result)
+        except requests.HTTPError:
+            return False  # 401 or server refused the cookie: fall back to a fresh login
+        except RuntimeError as e:
+            if not is_session_error(e):
+                raise
+            log("Cached Odoo session expired; logging in again…")
+            return False
+        if not info or info.get("uid") != cached.get("uid"):
+            return False
+        self.uid = info["uid"]
+        self.user_context = info.get("user_context") or cached.get("user_context") or {}
+        self._generation += 1
+        log(f"Reusing cached Odoo session (uid={self.uid})")
+        return True
+
+    def _save_session(self, db, username):
+        sid = self.session.cookies.get("session_id")
+        if not sid:
+            return
+        self._session_cache.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._session_cache.with_suffix(".tmp")
+        tmp.write_text(json.dumps({
+            "url": self.url, "db": db, "login": username, "session_id": sid,
+            "uid": self.uid, "user_context": self.user_context, "saved_at": time.time(),
+        }), encoding="utf-8")
+        os.chmod(tmp, 0o600)
+        tmp.replace(self._session_cache)
+
+    def _with_session(self, fn):
+        """Run fn(); on a session error log in again once (shared by all threads) and retry."""
+        generation = self._generation
+        try:
+            return fn()
+        except (RuntimeError, requests.HTTPError) as e:
+            if not self._login_args or not is_session_error(e):
+                raise
+            with self._login_lock:
+                if self._generation == generation:
+                    log("Odoo session expired; logging in again…")
+                    self._authenticate()
+            return fn()
+
+    def call_kw(self, model, method, args=None, kwargs=None):
+        """Call Odoo JSON-RPC endpoint /web/dataset/call_kw/{model}/{method}"""
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"model": model, "method": method, "args": args or [], "kwargs": kwargs or {}},
+        }
+        return self._with_session(lambda: self._request(
+            method, f"/web/dataset/call_kw/{model}/{method}", payload, self._json_result))
+
+    def export_data_stream(self, model, ids, field_names, context, kinds, columns=None):
+        """
+        export_data with the response parsed incrementally from the socket into
+        ColumnBuffers (see stream_decode.py) instead of r.json() + list of lists.
+        """
+        payload = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"model": model, "method": "export_data", "args": [ids, field_names],
+                       "kwargs": {"context": context or {}}},
+        }
+
+        def consume(r):
+            r.raw.decode_content = True
+            return decode_export_stream(r.raw, columns or field_names, kinds)
+
+        return self._with_session(lambda: self._request(
+            "export_data", f"/web/dataset/call_kw/{model}/export_data", payload, consume, stream=True))
+
+    # ---- /web/export/csv ----
+    def csrf_token(self) -> str:
+        """CSRF token of the current session (needed by type="http" POST routes), fetched once per login."""
+        csrf = self._csrf
+        if csrf and csrf[0] == self._generation:
+            return csrf[1]
+        with self._login_lock:  # concurrent CSV chunks: one GET /web, the others wait for its token
+            csrf = self._csrf
+            if csrf and csrf[0] == self._generation:
+                return csrf[1]
+            generation = self._generation
+            start = time.monotonic()
+            r = self.session.get(f"{self.url}/web", timeout=self.timeouts["default"])
+            self._count("csrf_token", calls=1, seconds=time.monotonic() - start, bytes_in=len(r.content))
+            if "/web/login" in r.url:
+                raise RuntimeError(SESSION_EXPIRED)
+            r.raise_for_status()
+            m = CSRF_RE.search(r.text)
+            if not m:
+                raise RuntimeError("csrf_token not found on /web")
+            self._csrf = (generation, m.group(1))
+            return m.group(1)
+
+    def export_csv_stream(self, model, ids, field_names, context, kinds, columns=None):
+        """
+        The export_data rows of 'ids' produced by Odoo's /web/export/csv controller
+        instead of JSON-RPC, parsed from the socket into ColumnBuffers as the CSV
+        arrives (see stream_decode.decode_export_csv).
+        """
+        data = {
+            "model": model, "fields": [{"name": f, "label": f} for f in field_names],
+            "ids": list(ids), "domain": [], "groupby": [], "context": context or {}, "import_compat": False,
+        }
+
+        def consume(r):
+            if "/web/login" in r.url:
+                raise RuntimeError(SESSION_EXPIRED)
+            if "csv" not in r.headers.get("Content-Type", ""):
+                raise RuntimeError(f"/web/export/csv returned {r.headers.get('Content-Type')}: {r.text[:300]}")
+            r.raw.decode_content = True
+            r.raw.auto_close = False  # the text wrapper in decode_export_csv reads to EOF; requests closes it
+            return decode_export_csv(r.raw, columns or field_names, kinds)
+
+        def call():
+            form = {"data": json.dumps(data), "token": "0", "csrf_token": self.csrf_token()}
+            return self._request("export_csv", "/web/export/csv", None, consume, stream=True, form=form)
+
+        return self._with_session(call)
+
+
+# =========================
+# Chunked export_data
+# =========================
+def _export_chunk(fetch, chunk):
+    """
+    Run fetch(ids) for one slice of ids; returns (rows, elapsed seconds).
+    Not retried here: OdooRpc._request already retries transport errors of
+    export_data/export_csv, streamed bodies included (tests/test_stream_retry.py),
+    and Odoo errors (access, invalid field) would only fail again.
+    """
+    start = time.monotonic()
+    return fetch(chunk), time.monotonic() - start
+
+
+def export_data_chunked(call_kw, model, ids, field_names, context=None,
+                        chunk_size=2000, max_workers=4,
+                        min_chunk=200, max_chunk=20000, target_seconds=8.0,
+                        log=log, fetch=None):
+    """
+    Split 'ids' into batches and run export_data for them over a bounded thread pool.
+
+    The next batch size follows observed throughput so that one call takes roughly
+    'target_seconds'. Rows are returned in the order of 'ids' (i.e. the search order),
+    exactly as a single export_data call would return them.
+
+    'fetch(ids)' replaces the plain export_data call, e.g. with a streaming
+    decoder; when it returns ColumnBuffers the parts are concatenated into one.
+    """
+    ids = list(ids)
+    if not ids:
+        return []
+    if fetch is None:
+        def fetch(chunk):
+            res = call_kw(model, "export_data", args=[chunk, field_names], kwargs={"context": context or {}})
+            return res.get("datas", [])
+
+    results = {}   # offset in ids -> rows
+    pending = {}   # future -> (offset, n)
+    pos = 0
+    size = max(min_chunk, min(chunk_size, max_chunk))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        def submit():
+            nonlocal pos
+            chunk = ids[pos:pos + size]
+            fut = pool.submit(contextvars.copy_context().run, _export_chunk, fetch, chunk)
+            pending[fut] = (pos, len(chunk))
+            pos += len(chunk)
+
+        while pos < len(ids) and len(pending) < max_workers:
+            submit()
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                offset, n = pending.pop(fut)
+                try:
+                    rows, elapsed = fut.result()
+                except Exception:
+                    for f in pending:
+                        f.cancel()
+                    raise
+                results[offset] = rows
+                # Adapt the batch size towards target latency (smoothed, clamped)
+                rate = n / max(elapsed, 0.001)
+                wanted = int(rate * target_seconds)
+                size = max(min_chunk, min(max_chunk, (size + wanted) // 2))
+                log(f"  chunk @{offset}: {n} ids in {elapsed:.1f}s → next chunk {size}")
+            while pos < len(ids) and len(pending) < max_workers:
+                submit()
+
+    parts = [results[offset] for offset in sorted(results)]
+    if isinstance(parts[0], ColumnBuffers):
+        return ColumnBuffers.concat(parts)
+    return [row for part in parts for row in part]
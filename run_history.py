@@ -0,0 +1,285 @@
+"""
+Per-stage timings of every export run, kept in a small SQLite database.
+
+    python run_history.py report                     # trends + slow stages of the last run
+    python run_history.py report --hour 13 --runs 30 # only runs started at 13:xx
+    python run_history.py show [run id]              # every stage of one run (default: last)
+
+run_jobs.py records one row per stage (login, preset, lines, fields_get, search,
+export, frame, save, sheets_auth, clear, update …) with its duration, row count
+and bytes on the wire. 'report' compares the newest run with the median of the
+runs before it and exits 1 when a stage got slower than the threshold allows.
+"""
+import argparse
+import sqlite3
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+# Where the time of each stage is spent: tells an Odoo slowdown from a Sheets one
+# (in pipeline order, which is also the column order of the report)
+STAGE_SOURCE = {
+    "login": "odoo", "sheets_auth": "sheets",
+    "preset": "odoo", "lines": "odoo", "fields_get": "odoo",
+    "search": "odoo", "mirror_sync": "odoo", "export": "odoo",
+    "frame": "local", "archive": "local", "save": "local",
+    "clear": "sheets", "update": "sheets",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    started  TEXT NOT NULL,          -- local time, ISO format
+    finished TEXT,
+    seconds  REAL,
+    ok       INTEGER,
+    label    TEXT
+);
+CREATE TABLE IF NOT EXISTS stages (
+    run_id   INTEGER NOT NULL REFERENCES runs(id),
+    job      TEXT NOT NULL,          -- '' for stages shared by the whole run (login, sheets_auth)
+    stage    TEXT NOT NULL,
+    started  REAL NOT NULL,          -- seconds since the start of the run
+    seconds  REAL NOT NULL,
+    rows     INTEGER,
+    bytes    INTEGER,
+    ok       INTEGER NOT NULL,
+    error    TEXT
+);
+CREATE INDEX IF NOT EXISTS stages_run ON stages(run_id);
+"""
+
+
+class Stage:
+    """Filled in by the caller inside a 'with run.stage(...)' block."""
+
+    def __init__(self):
+        self.rows = None
+        self.bytes = None
+
+
+# =========================
+# Recording
+# =========================
+class RunHistory:
+    """SQLite store of runs and their stages; safe to share between job threads."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.db.close()
+
+    def start_run(self, label: str = "") -> "Run":
+        started = datetime.now()
+        with self._lock, self.db:
+            cur = self.db.execute("INSERT INTO runs (started, label) VALUES (?, ?)",
+                                  (started.isoformat(timespec="seconds"), label))
+        return Run(self, cur.lastrowid)
+
+    def _add_stage(self, run_id, job, stage, started, seconds, st, error):
+        with self._lock, self.db:
+            self.db.execute(
+                "INSERT INTO stages (run_id, job, stage, started, seconds, rows, bytes, ok, error) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, job or "", stage, round(started, 3), round(seconds, 4),
+                 st.rows, st.bytes, int(error is None), error))
+
+    def _finish(self, run_id, seconds, ok):
+        with self._lock, self.db:
+            self.db.execute("UPDATE runs SET finished = ?, seconds = ?, ok = ? WHERE id = ?",
+                            (datetime.now().isoformat(timespec="seconds"), round(seconds, 3), int(ok), run_id))
+
+    # ---- queries ----
+    def runs(self, limit: int = 20, hour: int = None, ok_only: bool = True) -> list:
+        """Newest-first [(id, started, seconds)] of finished runs."""
+        sql = "SELECT id, started, seconds FROM runs WHERE finished IS NOT NULL"
+        args = []
+        if ok_only:
+            sql += " AND ok = 1"
+        if hour is not None:
+            sql += " AND CAST(strftime('%H', started) AS INTEGER) = ?"
+            args.append(hour)
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(limit)
+        with self._lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def stage_totals(self, run_ids) -> dict:
+        """{run_id: {(job, stage): (seconds, rows, bytes)}} — repeated stages of a job are summed."""
+        if not run_ids:
+            return {}
+        marks = ",".join("?" * len(run_ids))
+        with self._lock:
+            rows = self.db.execute(
+                f"SELECT run_id, job, stage, SUM(seconds), SUM(rows), SUM(bytes) FROM stages "
+                f"WHERE run_id IN ({marks}) GROUP BY run_id, job, stage", list(run_ids)).fetchall()
+        out = {rid: {} for rid in run_ids}
+        for rid, job, stage, sec, n, b in rows:
+            out[rid][(job, stage)] = (sec, n, b)
+        return out
+
+    def stages(self, run_id) -> list:
+        with self._lock:
+            return self.db.execute(
+                "SELECT job, stage, started, seconds, rows, bytes, ok, error FROM stages "
+                "WHERE run_id = ? ORDER BY started", (run_id,)).fetchall()
+
+
+class Run:
+    def __init__(self, history: RunHistory, run_id: int):
+        self.history = history
+        self.id = run_id
+        self._t0 = time.monotonic()
+
+    @contextmanager
+    def stage(self, job, name):
+        """Time the block; set .rows / .bytes on the yielded Stage. Failures are recorded too."""
+        st = Stage()
+        start = time.monotonic()
+        error = None
+        try:
+            yield st
+        except BaseException as e:
+            error = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            self.history._add_stage(self.id, job, name, start - self._t0, time.monotonic() - start, st, error)
+
+    def finish(self, ok: bool):
+        self.history._finish(self.id, time.monotonic() - self._t0, ok)
+
+
+class NullRun:
+    """Stand-in when run history is disabled."""
+    id = None
+
+    @contextmanager
+    def stage(self, job, name):
+        yield Stage()
+
+    def finish(self, ok: bool):
+        pass
+
+
+# =========================
+# Report
+# =========================
+def _fmt_bytes(n) -> str:
+    if not n:
+        return "-"
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if n < 1024 or unit == "GiB":
+            return f"{n:.0f} {unit}" if unit == "B" else f"{n:.1f} {unit}"
+        n /= 1024
+
+
+def regressions(history: RunHistory, runs: int = 10, threshold: float = 0.5, min_seconds: float = 1.0,
+                hour: int = None):
+    """
+    Compare the newest run with the median of up to 'runs' earlier ones, per (job, stage).
+    A stage is flagged when it is 'threshold' slower (0.5 = +50 %) and at least
+    'min_seconds' slower. Returns (latest run row, [(job, stage, base_s, now_s, rows_now, rows_base)]).
+    """
+    recent = history.runs(limit=runs + 1, hour=hour)
+    if len(recent) < 2:
+        return (recent[0] if recent else None), []
+    latest, earlier = recent[0], recent[1:]
+    totals = history.stage_totals([r[0] for r in recent])
+    flagged = []
+    for key, (now_s, now_rows, _) in sorted(totals[latest[0]].items()):
+        past = [totals[r[0]][key] for r in earlier if key in totals[r[0]]]
+        if not past:
+            continue
+        base_s = statistics.median(p[0] for p in past)
+        base_rows = statistics.median(p[1] or 0 for p in past)
+        if now_s > base_s * (1 + threshold) and now_s - base_s >= min_seconds:
+            flagged.append((key[0], key[1], base_s, now_s, now_rows, base_rows))
+    return latest, flagged
+
+
+def report(history: RunHistory, runs: int = 10, threshold: float = 0.5, min_seconds: float = 1.0,
+           hour: int = None) -> int:
+    recent = history.runs(limit=runs + 1, hour=hour)
+    if not recent:
+        print("No finished runs recorded yet.")
+        return 0
+
+    # Trend: seconds per stage (summed over jobs), oldest first
+    totals = history.stage_totals([r[0] for r in recent])
+    names = sorted({s for t in totals.values() for _, s in t},
+                   key=lambda s: (list(STAGE_SOURCE).index(s) if s in STAGE_SOURCE else 99, s))
+    print(f"{'run':>5}  {'started':<19} {'total':>7}" + "".join(f"{n:>12}" for n in names))
+    for rid, started, seconds in reversed(recent):
+        per = {}
+        for (_, s), (sec, _, _) in totals[rid].items():
+            per[s] = per.get(s, 0.0) + sec
+        print(f"{rid:>5}  {started:<19} {seconds or 0:7.1f}" +
+              "".join(f"{per[n]:12.2f}" if n in per else f"{'-':>12}" for n in names))
+
+    latest, flagged = regressions(history, runs, threshold, min_seconds, hour)
+    if len(recent) < 2:
+        print(f"\nRun {latest[0]}: no earlier run to compare with yet.")
+        return 0
+    if not flagged:
+        print(f"\n✅ Run {latest[0]}: no stage slower than the baseline (+{threshold * 100:.0f}%).")
+        return 0
+    print(f"\n❌ Run {latest[0]} ({latest[1]}): stages slower than the median of the previous runs")
+    for job, stage, base_s, now_s, rows, base_rows in flagged:
+        source = STAGE_SOURCE.get(stage, "?")
+        grew = f", rows {base_rows:.0f} → {rows}" if rows is not None and base_rows and rows != base_rows else ""
+        print(f"  [{source:<6}] {job or '(run)'}/{stage}: {base_s:.2f}s → {now_s:.2f}s "
+              f"(+{(now_s / max(base_s, 1e-9) - 1) * 100:.0f}%){grew}")
+    return 1
+
+
+def show(history: RunHistory, run_id=None) -> int:
+    if run_id is None:
+        last = history.runs(limit=1, ok_only=False)
+        if not last:
+            print("No finished runs recorded yet.")
+            return 0
+        run_id = last[0][0]
+    print(f"Run {run_id}")
+    print(f"  {'job':<10} {'stage':<12} {'at':>8} {'seconds':>9} {'rows':>9} {'bytes':>11}  source")
+    for job, stage, started, seconds, rows, nbytes, ok, error in history.stages(run_id):
+        rate = f"  {nbytes / seconds / 1048576:.1f} MiB/s" if nbytes and seconds > 0.05 else ""
+        status = "" if ok else f"  ❌ {error}"
+        print(f"  {job or '-':<10} {stage:<12} {started:8.2f} {seconds:9.3f} {rows if rows is not None else '-':>9} "
+              f"{_fmt_bytes(nbytes):>11}  {STAGE_SOURCE.get(stage, '?')}{rate}{status}")
+    return 0
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Run history of the export jobs")
+    ap.add_argument("--db", default=".cache/run_history.sqlite")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    rp = sub.add_parser("report", help="stage trends and regressions of the newest run")
+    rp.add_argument("--runs", type=int, default=10, help="baseline size (previous successful runs)")
+    rp.add_argument("--threshold", type=float, default=0.5, help="allowed slowdown (0.5 = +50%%)")
+    rp.add_argument("--min-seconds", type=float, default=1.0, help="ignore slowdowns smaller than this")
+    rp.add_argument("--hour", type=int, help="only runs started at this hour (e.g. 13)")
+    sp = sub.add_parser("show", help="every stage of one run")
+    sp.add_argument("run_id", type=int, nargs="?")
+    args = ap.parse_args(argv)
+
+    history = RunHistory(args.db)
+    try:
+        if args.cmd == "report":
+            return report(history, args.runs, args.threshold, args.min_seconds, args.hour)
+        return show(history, args.run_id)
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
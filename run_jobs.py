@@ -0,0 +1,531 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+from odoo_rpc import OdooRpc, export_data_chunked, metered
+from odoo_async import AsyncOdoo
+from odoo_mirror import ExportMirror
+from meta_cache import MetaCache
+from run_history import RunHistory, NullRun
+from snapshots import write_snapshot, prune_snapshots
+from stream_decode import ColumnBuffers, column_kinds, frame_dtypes, compact_frame, frame_rows
+from sheet_values import build_values, iter_values
+from sheets_client import SheetsClient
+from sheets_writer import ChunkedWriter, QuotaScheduler
+from sheets_diff import upload_diff, col_letter
+
+from dotenv import load_dotenv
+
+# Load variables from .env
+load_dotenv()
+
+# =========================
+# CONFIG — pulled from environment
+# =========================
+ODOO_URL   = os.getenv("ODOO_URL")
+DB         = os.getenv("ODOO_DB")
+USERNAME   = os.getenv("ODOO_USERNAME")
+PASSWORD   = os.getenv("ODOO_PASSWORD")
+TZ         = "Asia/Dhaka"
+
+SERVICE_ACCOUNT_JSON = "credentials.json"
+SHEETS_CACHE         = ".cache/google_sheets.json"   # access token + spreadsheet/sheet ids (kept out of the CI cache)
+
+# Sheets write quotas (requests per minute) and request sizing for large uploads
+SHEETS_WRITES_PER_MIN_USER    = 60
+SHEETS_WRITES_PER_MIN_PROJECT = 300
+SHEETS_MAX_REQUEST_BYTES      = 1_500_000
+SHEETS_WRITE_WORKERS          = 4
+GOOGLE_SHEET_URL     = "https://docs.google.com/spreadsheets/d/1fnOSIWQa_mbfMHdgPatjYEIhG3kQlzPy0djHG8TOszk/edit?gid=1326846174"
+
+# =========================
+# JOBS — one entry per sheet; keys missing from a job fall back to JOB_DEFAULTS
+# =========================
+JOB_DEFAULTS = {
+    "model": "pending.stock.config",   # target model of the export preset
+    "export_id": 670,                  # ir.exports preset id
+    "domain": [],                      # Odoo domain filter; [] = all records
+    "sheet_url": GOOGLE_SHEET_URL,
+    "columns": 10,                     # keep first N preset columns (A:J); only these are exported
+    "fields": None,                    # explicit field list, or {field: header}; overrides "columns"
+    "outfile": None,                   # optional local xlsx copy (saved then deleted), e.g. "pending_stock_{name}.xlsx"
+    "diff_upload": True,               # send only changed cells instead of clear + full rewrite
+    "chunk_size": 2000,                # export_data batch size (0 = one call); adapts to latency
+    "workers": 4,                      # concurrent export_data calls per job
+    "incremental": False,              # SQLite mirror + write_date watermark (see odoo_mirror.py)
+    "stream": True,                    # parse export_data responses incrementally into column buffers
+    "engine": "json",                  # "json": export_data over JSON-RPC; "csv": Odoo's /web/export/csv controller
+    "pipeline": "lite",                # "lite": rows -> Sheets values without pandas; "pandas": via DataFrame
+    "compact_dtypes": True,            # DataFrame columns typed from fields_get (category, numeric, datetime64)
+    "mirror_full_hours": 24,
+}
+
+JOBS = [
+    {"name": "zipper", "company_ids": [1], "sheet": "Zipper Raw"},
+    {"name": "metal",  "company_ids": [3], "sheet": "Metal Raw"},
+]
+
+MAX_PARALLEL_JOBS = 4
+
+# Odoo transport (see odoo_rpc.OdooRpc)
+RPC_POOL_SIZE      = 16       # keep-alive connections shared by all jobs/workers
+RPC_RETRIES        = 3        # retries for idempotent reads (search, read, fields_get, export_data…)
+RPC_TIMEOUTS       = {}       # per-method (connect, read) overrides, e.g. {"export_data": (10, 600)}
+RPC_GZIP_MIN_BYTES = None     # gzip request bodies above this size (server must accept it)
+RPC_CONCURRENCY    = 4        # independent metadata/search calls in flight at once (see odoo_async.py)
+SESSION_CACHE      = ".cache/odoo_session.json"  # reuse session_id/uid between runs (kept out of the CI cache); None = always log in
+MIRROR_DB         = ".cache/odoo_mirror.sqlite"
+META_CACHE        = ".cache/odoo_meta.json"   # preset field names + labels; None = always reload
+META_TTL          = 6 * 3600                  # trust cached metadata this long before re-validating
+META_FIELDS_TTL   = 24 * 3600                 # reload labels/types (fields_get) at least this often
+SNAPSHOT_DIR      = ".cache/snapshots"        # Parquet archive of every run (see snapshots.py); None = off
+SNAPSHOT_KEEP_DAYS = 30                       # delete archived runs older than this; None = keep all
+RUN_HISTORY_DB    = ".cache/run_history.sqlite"  # per-stage timings of every run (see run_history.py); None = off
+
+
+# =========================
+# Helpers
+# =========================
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def job_logger(name: str):
+    return lambda msg: log(f"[{name}] {msg}")
+
+
+@contextmanager
+def timed(run, job, name):
+    """run.stage() that also counts the Odoo traffic of the block as the stage's bytes."""
+    with run.stage(job, name) as st, metered() as io:
+        yield st
+        if st.bytes is None:
+            st.bytes = io["bytes_in"] + io["bytes_out"] or None
+
+
+def no_stage(name):
+    return NullRun().stage("", name)
+
+
+class Shared:
+    """State shared across jobs of one run: Odoo session, Sheets client, preset lookups."""
+
+    def __init__(self, rpc: OdooRpc, sheets: SheetsClient, meta: MetaCache = None):
+        self.rpc = rpc
+        self.aio = AsyncOdoo(rpc, RPC_CONCURRENCY)
+        self.sheets = sheets
+        self.quota = QuotaScheduler(SHEETS_WRITES_PER_MIN_USER, SHEETS_WRITES_PER_MIN_PROJECT)
+        self.meta = meta
+        self._lock = threading.Lock()
+        self._presets = {}
+
+    def _memo(self, store, key, compute):
+        with self._lock:
+            ev = store.get(key)
+            owner = ev is None
+            if owner:
+                ev = store[key] = {"done": threading.Event()}
+        if owner:
+            try:
+                ev["value"] = compute()
+            except Exception as e:
+                ev["error"] = e
+            finally:
+                ev["done"].set()
+        ev["done"].wait()
+        if "error" in ev:
+            raise ev["error"]
+        return ev["value"]
+
+    def preset(self, model, export_id, ctx, log, stage=no_stage):
+        def load():
+            loader = lambda: load_preset(self.aio, model, export_id, ctx, log, stage)
+            if self.meta is None:
+                return loader()
+            return self.meta.get(self.aio, model, export_id, ctx, loader, log)
+
+        companies = tuple(ctx.get("allowed_company_ids") or [])
+        return self._memo(self._presets, (model, export_id, companies), load)
+
+    def forget_presets(self):
+        """Drop the presets memoised for this run; a long-lived Shared (daemon.py) re-checks them via MetaCache."""
+        with self._lock:
+            self._presets = {}
+
+
+def load_preset(aio: AsyncOdoo, model, export_id, ctx, log=log, stage=no_stage):
+    """
+    Return (field_names, columns, field_types) of an ir.exports preset, in preset order.
+    The preset, its lines and fields_get are independent lookups and run concurrently
+    (one round trip); 'stage(name)' times the "lines" and "fields_get" ones (see run_history.py).
+    """
+    log(f"Loading export preset {export_id} …")
+
+    async def preset(_):
+        return await aio.call_kw(
+            "ir.exports", "search_read",
+            args=[[["id", "=", export_id]]],
+            kwargs={"fields": ["id", "name", "resource", "export_fields"], "context": ctx},
+        )
+
+    # Field names of the lines (server has no 'label' on ir.exports.line)
+    async def lines(_):
+        with stage("lines") as st:
+            res = await aio.call_kw("ir.exports.line", "search_read", args=[[["export_id", "=", export_id]]],
+                                    kwargs={"fields": ["id", "name"], "order": "id", "context": ctx})
+            st.rows = len(res)
+        return res
+
+    # Labels/types of every field of the model: needs no preset line, so no wait for them
+    async def fields_get(_):
+        with stage("fields_get") as st:
+            res = await aio.call_kw(model, "fields_get", args=[],
+                                    kwargs={"attributes": ["string", "type"], "context": ctx})
+            st.rows = len(res)
+        return res
+
+    done = aio.run({"preset": ((), preset), "lines": ((), lines), "fields_get": ((), fields_get)})
+    exp_rec = done["preset"][0] if done["preset"] else None
+    if not exp_rec:
+        raise RuntimeError(f"Export preset with ID {export_id} not found.")
+    if exp_rec["resource"] != model:
+        raise RuntimeError(f"Preset {export_id} is for model '{exp_rec['resource']}', not '{model}'")
+    export_line_ids = exp_rec["export_fields"]  # numeric ir.exports.line IDs, in preset order
+
+    by_id = {l["id"]: l for l in done["lines"]}
+    ordered = [by_id[i] for i in export_line_ids if i in by_id]
+    field_names = [l["name"] for l in ordered]  # e.g., "inventory_code", "product_type", "product_type/id"
+    missing = [i for i in export_line_ids if i not in by_id]
+    if missing:
+        log(f"⚠️ Missing export line IDs (ignored): {missing}")
+    if not field_names:
+        raise RuntimeError("No export fields resolved (field_names is empty).")
+
+    # Pretty headers from the base field (handles '/id', '/display_name', etc.)
+    fg = done["fields_get"]
+
+    def pretty_label(name: str) -> str:
+        if "/" in name:
+            base, suffix = name.split("/", 1)
+            base_label = fg.get(base, {}).get("string", base)
+            if suffix in ("display_name", "name"):
+                return base_label
+            if suffix == "id":
+                return f"{base_label} (ID)"
+            return f"{base_label}/{suffix}"
+        return fg.get(name, {}).get("string", name)
+
+    base_fields = set(n.split("/")[0] for n in field_names)
+    field_types = {f: meta.get("type") for f, meta in fg.items() if f in base_fields}
+    return field_names, [pretty_label(n) for n in field_names], field_types
+
+
+def project_fields(field_names, columns, job):
+    """
+    Narrow the preset to the fields that reach the sheet, before export_data:
+    an explicit job["fields"] list/mapping, else the first job["columns"] fields.
+    """
+    wanted = job.get("fields")
+    if wanted:
+        labels = dict(zip(field_names, columns))
+        if isinstance(wanted, dict):
+            return list(wanted), list(wanted.values())
+        return list(wanted), [labels.get(f, f) for f in wanted]
+    n_cols = job.get("columns")
+    if n_cols and len(field_names) > n_cols:
+        return field_names[:n_cols], columns[:n_cols]
+    return field_names, columns
+
+
+def build_frame(rows, columns, dtypes=None):
+    """
+    DataFrame of the export rows; pandas is only imported when a feature needs it.
+    With 'dtypes' (stream_decode.frame_dtypes) columns get compact dtypes instead of object.
+    """
+    if isinstance(rows, ColumnBuffers):
+        df = rows.to_dataframe()
+        df.columns = columns
+    else:
+        import pandas as pd
+        df = pd.DataFrame(rows, columns=columns)
+    return compact_frame(df, dtypes) if dtypes else df
+
+
+def save_local_copy(df, outfile, log=log):
+    """Save df to xlsx with a timestamped fallback if the file is locked; returns the path."""
+    try:
+        # Try to overwrite existing file (may fail if open in Excel)
+        p = Path(outfile)
+        if p.exists():
+            try:
+                p.unlink()
+            except PermissionError:
+                pass
+        df.to_excel(outfile, index=False)
+        log(f"Saved local copy: {outfile}")
+        return outfile
+    except PermissionError:
+        ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        alt = Path(outfile).with_name(f"{Path(outfile).stem}_{ts}.xlsx")
+        df.to_excel(alt, index=False)
+        log(f"⚠️ '{outfile}' is in use. Saved to '{alt}' instead.")
+        return str(alt)
+
+
+# =========================
+# Upload step (shared with the browser exporters and "cli.py upload")
+# =========================
+def upload_values(worksheet, values, width, quota, diff_upload=True, log=log, stage=no_stage):
+    """Write header + rows 'values' (list or iterator) to A1 of the worksheet: changed cells only, or clear + full rewrite."""
+    writer = ChunkedWriter(worksheet, quota, max_request_bytes=SHEETS_MAX_REQUEST_BYTES,
+                           workers=SHEETS_WRITE_WORKERS, log=log)
+    m = writer.metrics
+    if diff_upload:
+        snapshot = f".cache/sheet_{worksheet.title.replace(' ', '_')}.json"
+        with stage("update") as st:
+            upload_diff(worksheet, values, snapshot, width=width, log=log, writer=writer)
+            st.rows, st.bytes = m["rows"], m["bytes"]
+    else:
+        values = values if isinstance(values, list) else list(values)
+        last_col_letter = col_letter(width)
+        log(f"Clearing range A:{last_col_letter} …")
+        with stage("clear"):
+            worksheet.batch_clear([f"A:{last_col_letter}"])
+        with stage("update") as st:
+            if len(values) > worksheet.row_count:
+                worksheet.add_rows(len(values) - worksheet.row_count)
+            log(f"Uploading to A1:{last_col_letter}{len(values)} …")
+            writer.write_table(values, width)
+            st.rows, st.bytes = m["rows"], m["bytes"]
+    if m["requests"]:
+        log(f"Sheets: {m['requests']} request(s), {m['rows']} rows, {m['bytes'] / 1024:.0f} KiB, "
+            f"{m['retries']} retries, {m['throttled_s']:.1f}s throttled, {m['elapsed_s']:.1f}s")
+    log("✅ Uploaded to Google Sheet.")
+    return m
+
+
+def upload_export(header, rows, sheet, sheet_url=GOOGLE_SHEET_URL, width=10, log=log):
+    """Upload rows exported elsewhere (browser download, saved file) without touching Odoo."""
+    sheets = SheetsClient(SERVICE_ACCOUNT_JSON, cache_path=SHEETS_CACHE)
+    quota = QuotaScheduler(SHEETS_WRITES_PER_MIN_USER, SHEETS_WRITES_PER_MIN_PROJECT)
+    worksheet = sheets.worksheet(sheet_url, sheet)
+    return upload_values(worksheet, build_values(header, rows, width), width, quota, log=log)
+
+
+# =========================
+# One job
+# =========================
+def run_job(shared: Shared, job: dict, run=None) -> dict:
+    """Export one job to its sheet; each stage is timed into 'run' (run_history.Run) when given."""
+    job = {**JOB_DEFAULTS, **job}
+    name = job["name"]
+    jlog = job_logger(name)
+    run = run or NullRun()
+    stage = lambda stage_name: timed(run, name, stage_name)
+    call_kw = shared.rpc.call_kw
+    model = job["model"]
+    ctx = {**shared.rpc.user_context, "lang": "en_US", "tz": TZ, "uid": shared.rpc.uid,
+           "allowed_company_ids": job["company_ids"]}
+
+    # The id search needs only the model: it runs alongside the preset lookups
+    async def preset(_):
+        with stage("preset") as st:
+            res = await shared.aio.call(shared.preset, model, job["export_id"], ctx, jlog, stage)
+            st.rows = len(res[0])
+        return res
+
+    async def search(_):
+        jlog("Searching records…")
+        with stage("search") as st:
+            res = await shared.aio.call_kw(model, "search", args=[job["domain"]], kwargs={"context": ctx})
+            st.rows = len(res)
+        return res
+
+    graph = {"preset": ((), preset)}
+    if not job["incremental"]:
+        graph["search"] = ((), search)
+    done = shared.aio.run(graph)
+    preset_fields, preset_columns, field_types = done["preset"]
+    field_names, columns = project_fields(preset_fields, preset_columns, job)
+    if len(field_names) < len(preset_fields):
+        jlog(f"Exporting {len(field_names)} of {len(preset_fields)} preset fields")
+
+    def export(export_ids, export_fields):
+        fetch = None
+        kinds = column_kinds(export_fields, field_types)
+        if job["engine"] == "csv":
+            fetch = lambda chunk: shared.rpc.export_csv_stream(model, chunk, export_fields, ctx, kinds)
+        elif job["stream"]:
+            fetch = lambda chunk: shared.rpc.export_data_stream(model, chunk, export_fields, ctx, kinds)
+        chunk_size = job["chunk_size"]
+        via = "/web/export/csv" if job["engine"] == "csv" else "export_data"
+        with stage("export") as st:
+            if chunk_size and len(export_ids) > chunk_size:
+                jlog(f"Exporting {len(export_ids)} records via {via} in chunks (~{chunk_size} ids, {job['workers']} workers)…")
+                rows = export_data_chunked(call_kw, model, export_ids, export_fields, context=ctx,
+                                           chunk_size=chunk_size, max_workers=job["workers"], log=jlog, fetch=fetch)
+            else:
+                jlog(f"Exporting {len(export_ids)} records via {via}…")
+                if fetch:
+                    rows = fetch(export_ids)
+                else:
+                    export_res = call_kw(model, "export_data", args=[export_ids, export_fields], kwargs={"context": ctx})
+                    rows = export_res.get("datas", [])
+            st.rows = len(rows)
+        return rows
+
+    if job["incremental"]:
+        jlog(f"Syncing local mirror {MIRROR_DB} …")
+        scope = f"{model}:{job['export_id']}:{','.join(map(str, job['company_ids']))}"
+        mirror = ExportMirror(MIRROR_DB, scope, field_names, full_refresh_hours=job["mirror_full_hours"])
+        try:
+            with stage("mirror_sync") as st:
+                ids, rows = mirror.sync(call_kw, model, job["domain"], ctx, export, log=jlog)
+                st.rows = len(ids)
+        finally:
+            mirror.close()
+    else:
+        ids = done["search"]
+        rows = export(ids, field_names) if ids else []
+    jlog(f"Found {len(ids)} records")
+    if not ids:
+        jlog("No records match the domain; nothing to export.")
+        return {"rows": 0}
+
+    df = None
+    dtypes = frame_dtypes(field_names, field_types) if job["compact_dtypes"] else None
+    if job["pipeline"] == "pandas" or job["outfile"]:
+        with stage("frame") as st:
+            df = build_frame(rows, columns, dtypes)
+            st.rows = len(df)
+            st.bytes = int(df.memory_usage(deep=True).sum())
+        jlog(f"DataFrame shape: {df.shape}, {st.bytes / 2**20:.1f} MiB")
+
+    if SNAPSHOT_DIR:
+        try:
+            with stage("archive") as st:
+                path = write_snapshot(SNAPSHOT_DIR, job["company_ids"], name, columns, rows)
+                st.rows, st.bytes = len(rows), Path(path).stat().st_size
+            jlog(f"Archived snapshot: {path}")
+        except Exception as e:
+            jlog(f"⚠️ Snapshot not archived: {e}")
+
+    saved_path = None
+    if job["outfile"]:
+        with stage("save") as st:
+            saved_path = save_local_copy(df, job["outfile"].format(name=name), jlog)
+            st.rows, st.bytes = len(df), Path(saved_path).stat().st_size
+
+    # Google Sheets upload
+    worksheet = shared.sheets.worksheet(job["sheet_url"], job["sheet"])
+    width = max(len(columns), 1)
+    # Rows go to the diff one at a time (no full list of Sheets values next to the buffers)
+    if job["pipeline"] == "pandas":
+        values = iter_values(df.columns.tolist(), frame_rows(df, dtypes), width)
+    else:
+        values = iter_values(columns, rows, width)
+    upload_values(worksheet, values, width, shared.quota, job["diff_upload"], jlog, stage)
+
+    # Cleanup local file (best-effort)
+    if saved_path:
+        try:
+            Path(saved_path).unlink()
+            jlog(f"🗑️ Deleted local file: {saved_path}")
+        except PermissionError:
+            jlog(f"⚠️ Could not delete '{saved_path}' (still open). Close it and delete manually.")
+
+    return {"rows": len(rows)}
+
+
+# =========================
+# Runner
+# =========================
+def connect(run=None) -> Shared:
+    """Log into Odoo and set up the Sheets client: the state every job of a run shares."""
+    run = run or NullRun()
+    log("Logging into Odoo…")
+    rpc = OdooRpc(ODOO_URL, pool_size=RPC_POOL_SIZE, timeouts=RPC_TIMEOUTS,
+                  retries=RPC_RETRIES, gzip_min_bytes=RPC_GZIP_MIN_BYTES)
+    with timed(run, "", "login"):
+        uid = rpc.login(DB, USERNAME, PASSWORD, session_cache=SESSION_CACHE)
+    log(f"✅ Logged in (uid={uid})")
+
+    log("Loading Google credentials (cached token)…")
+    meta = MetaCache(META_CACHE, ttl=META_TTL, fields_ttl=META_FIELDS_TTL) if META_CACHE else None
+    with run.stage("", "sheets_auth"):
+        sheets = SheetsClient(SERVICE_ACCOUNT_JSON, cache_path=SHEETS_CACHE)
+        sheets.authorize()
+    return Shared(rpc, sheets, meta)
+
+
+def run(jobs=None, shared: Shared = None) -> list:
+    """Log in once (unless 'shared' is given), run all jobs concurrently and return one result dict per job."""
+    jobs = jobs if jobs is not None else JOBS
+    history = RunHistory(RUN_HISTORY_DB) if RUN_HISTORY_DB else None
+    current = history.start_run(",".join(j["name"] for j in jobs)) if history else NullRun()
+    try:
+        shared = shared or connect(current)
+    except Exception:
+        current.finish(False)
+        if history:
+            history.close()
+        raise
+    rpc = shared.rpc
+
+    def guarded(job):
+        start = time.monotonic()
+        try:
+            res = run_job(shared, job, current)
+            return {"name": job["name"], "ok": True, "rows": res["rows"], "error": None,
+                    "seconds": time.monotonic() - start}
+        except Exception as e:
+            log(f"[{job['name']}] ❌ ERROR: {e}")
+            return {"name": job["name"], "ok": False, "rows": 0, "error": str(e),
+                    "seconds": time.monotonic() - start}
+
+    with ThreadPoolExecutor(max_workers=max(1, min(MAX_PARALLEL_JOBS, len(jobs)))) as pool:
+        results = list(pool.map(guarded, jobs))
+    current.finish(all(r["ok"] for r in results))
+    if SNAPSHOT_DIR and SNAPSHOT_KEEP_DAYS:
+        try:
+            removed = prune_snapshots(SNAPSHOT_DIR, SNAPSHOT_KEEP_DAYS)
+            if removed:
+                log(f"🗑️ Pruned {len(removed)} snapshot(s) older than {SNAPSHOT_KEEP_DAYS} days")
+        except Exception as e:
+            log(f"⚠️ Snapshots not pruned: {e}")
+
+    log("Summary:")
+    for r in results:
+        status = "✅" if r["ok"] else f"❌ {r['error']}"
+        log(f"  {r['name']:<10} rows={r['rows']:<7} {r['seconds']:6.1f}s  {status}")
+    log("Odoo RPC:")
+    for line in rpc.stats_summary().splitlines():
+        log(f"  {line}")
+    if history:
+        log(f"Stage timings saved as run {current.id} (python run_history.py show {current.id})")
+        history.close()
+    return results
+
+
+def main(argv=None):
+    """python run_jobs.py [job names...] — runs every job in JOBS when none are given."""
+    names = list(argv if argv is not None else sys.argv[1:])
+    jobs = [j for j in JOBS if not names or j["name"] in names]
+    unknown = set(names) - {j["name"] for j in JOBS}
+    if unknown:
+        raise SystemExit(f"Unknown job(s): {', '.join(sorted(unknown))}")
+    results = run(jobs)
+    return 0 if all(r["ok"] for r in results) else 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except Exception as e:
+        log(f"❌ ERROR: {e}")
+        raise
@@ -0,0 +1,55 @@
+import math
+from datetime import date, datetime
+from decimal import Decimal
+
+
+# =========================
+# Rows -> Sheets values payload (no pandas)
+# =========================
+def to_cell(v):
+    """
+    One cell as the Sheets API accepts it: None/NaN/inf -> '', datetimes/dates
+    -> 'YYYY-MM-DD[ HH:MM:SS]', Decimal and numpy scalars -> plain numbers.
+    Booleans are kept (Odoo's False-for-empty renders as it always has).
+    """
+    if v is None:
+        return ""
+    t = type(v)
+    if t is str or t is int or t is bool:
+        return v
+    if t is float:
+        return "" if math.isnan(v) or math.isinf(v) else v
+    if v != v:  # NaT / numpy NaN
+        return ""
+    if isinstance(v, datetime):
+        return v.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(v, date):
+        return v.isoformat()
+    if isinstance(v, Decimal):
+        return to_cell(float(v))
+    if hasattr(v, "item"):  # numpy / pandas scalar
+        return to_cell(v.item())
+    if isinstance(v, float):
+        return to_cell(float(v))
+    return str(v)
+
+
+def iter_values(header, rows, width=None):
+    """
+    Header + rows -> rows of Sheets cells, one at a time: rows are cut or padded
+    to 'width' columns and every cell normalized. 'rows' may be any iterable of
+    sequences (export_data rows, ColumnBuffers, …).
+    """
+    width = width or len(header)
+    yield [to_cell(h) for h in list(header)[:width]]
+    pad = [""] * width
+    for row in rows:
+        out = [to_cell(v) for v in row[:width]]
+        if len(out) < width:
+            out.extend(pad[len(out):])
+        yield out
+
+
+def build_values(header, rows, width=None):
+    """iter_values() as a list of lists for worksheet.update / values.batchUpdate."""
+    return list(iter_values(header, rows, width))
@@ -0,0 +1,275 @@
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+import requests
+
+# Maintained auth library (replaces oauth2client): pip install google-auth
+try:
+    from google.oauth2 import service_account
+    from google.auth.transport.requests import Request as GoogleAuthRequest
+except ImportError:
+    service_account = GoogleAuthRequest = None
+
+
+SCOPES = ["https://www.googleapis.com/auth/spreadsheets"]
+SHEETS_API_URL = os.getenv("SHEETS_API_URL", "https://sheets.googleapis.com/v4")
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def spreadsheet_id_from_url(url: str) -> str:
+    m = re.search(r"/spreadsheets/d/([a-zA-Z0-9-_]+)", url)
+    if not m:
+        raise ValueError(f"Not a Google Sheets URL: {url}")
+    return m.group(1)
+
+
+def _quote_title(title: str) -> str:
+    return "'" + title.replace("'", "''") + "'"
+
+
+class SheetNotFound(RuntimeError):
+    pass
+
+
+# =========================
+# Client: cached token + cached sheet metadata
+# =========================
+class SheetsClient:
+    """
+    Thin Sheets v4 REST client.
+
+    The service-account access token is cached on disk until shortly before it
+    expires. Spreadsheet ids, sheet gids, titles and grid sizes are cached too,
+    so opening a worksheet costs no request; metadata is fetched again only when
+    a range cannot be resolved (sheet renamed/missing).
+    'keyfile=None' sends unauthenticated requests (local fake server).
+    """
+
+    def __init__(self, keyfile=None, cache_path=".cache/google_sheets.json", api_url=SHEETS_API_URL):
+        self.api_url = api_url.rstrip("/")
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.session = requests.Session()
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+        self.creds = None
+        if keyfile:
+            if service_account is None:
+                raise RuntimeError("Google Sheets client needs google-auth (pip install google-auth).")
+            self.creds = service_account.Credentials.from_service_account_file(keyfile, scopes=SCOPES)
+            tok = self._cache.get("token") or {}
+            if tok.get("account") == self.creds.service_account_email and tok.get("expiry", 0) > time.time() + 120:
+                self.creds.token = tok["token"]
+                # google-auth compares expiry as naive UTC
+                self.creds.expiry = datetime.fromtimestamp(tok["expiry"], timezone.utc).replace(tzinfo=None)
+
+    # ---- cache ----
+    def _load_cache(self):
+        if not self.cache_path:
+            return {}
+        try:
+            return json.loads(self.cache_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self._cache, indent=1), encoding="utf-8")
+        os.chmod(tmp, 0o600)
+        tmp.replace(self.cache_path)
+
+    def _headers(self):
+        if not self.creds:
+            return {}
+        with self._lock:
+            if not self.creds.valid:
+                log("Refreshing Google access token…")
+                self.creds.refresh(GoogleAuthRequest())
+                expiry = self.creds.expiry.replace(tzinfo=timezone.utc).timestamp()
+                self._cache["token"] = {"account": self.creds.service_account_email,
+                                        "token": self.creds.token, "expiry": expiry}
+                self._save_cache()
+            return {"Authorization": f"Bearer {self.creds.token}"}
+
+    def authorize(self):
+        """Make sure a valid access token is at hand (refreshing it now rather than on the first write)."""
+        self._headers()
+
+    # ---- HTTP ----
+    def request(self, method, path, **kw):
+        r = self.session.request(method, f"{self.api_url}{path}", headers=self._headers(), timeout=(10, 120), **kw)
+        if r.status_code >= 400:
+            raise requests.HTTPError(f"{r.status_code} {method} {path}: {r.text[:300]}", response=r)
+        return r.json() if r.content else {}
+
+    # ---- metadata ----
+    def fetch_sheets(self, spreadsheet_id) -> dict:
+        """Fetch and cache {title: {gid, rows, cols}} for every sheet of the spreadsheet."""
+        res = self.request("GET", f"/spreadsheets/{spreadsheet_id}",
+                           params={"fields": "sheets.properties(sheetId,title,gridProperties)"})
+        sheets = {}
+        for sh in res.get("sheets", []):
+            p = sh["properties"]
+            grid = p.get("gridProperties", {})
+            sheets[p["title"]] = {"gid": p["sheetId"], "rows": grid.get("rowCount", 1000),
+                                  "cols": grid.get("columnCount", 26)}
+        with self._lock:
+            self._cache.setdefault("spreadsheets", {})[spreadsheet_id] = sheets
+            self._save_cache()
+        return sheets
+
+    def sheet_meta(self, spreadsheet_id, title, refresh=False):
+        with self._lock:
+            sheets = (self._cache.get("spreadsheets") or {}).get(spreadsheet_id)
+        if refresh or not sheets or title not in sheets:
+            sheets = self.fetch_sheets(spreadsheet_id)
+        if title not in sheets:
+            raise SheetNotFound(f"Worksheet '{title}' not found in spreadsheet {spreadsheet_id}")
+        return sheets[title]
+
+    def update_meta(self, spreadsheet_id, title, **fields):
+        with self._lock:
+            sheets = self._cache.setdefault("spreadsheets", {}).setdefault(spreadsheet_id, {})
+            sheets.setdefault(title, {}).update(fields)
+            self._save_cache()
+
+    def worksheet(self, url_or_id: str, title: str) -> "Worksheet":
+        sid = spreadsheet_id_from_url(url_or_id) if "/" in url_or_id else url_or_id
+        return Worksheet(self, sid, title)
+
+
+# =========================
+# Worksheet handle (gspread-compatible subset used by the uploaders)
+# =========================
+def _is_range_error(e: requests.HTTPError) -> bool:
+    r = e.response
+    return r is not None and r.status_code == 400 and "Unable to parse range" in r.text
+
+
+def _is_grid_error(e: requests.HTTPError) -> bool:
+    r = e.response
+    return r is not None and r.status_code == 400 and "exceeds grid limits" in r.text
+
+
+def _end_row(rng: str, n_rows: int) -> int:
+    """Last row written by 'n_rows' values at an A1 range: 'A1:J2000' -> 2000, 'A5' -> 5 + n_rows - 1."""
+    cells = rng.rsplit("!", 1)[-1].split(":")
+    rows = [int(m.group(1)) if (m := re.search(r"(\d+)$", c)) else 1 for c in cells]
+    return rows[1] if len(rows) > 1 else rows[0] + n_rows - 1
+
+
+class Worksheet:
+    def __init__(self, client: SheetsClient, spreadsheet_id: str, title: str):
+        self.client = client
+        self.id = spreadsheet_id
+        self.title = title
+        self._meta = None
+        self._grid_lock = threading.Lock()  # parallel chunk writers hitting the grid limit add rows once
+
+    @property
+    def spreadsheet(self):
+        # sheets_diff addresses the spreadsheet through worksheet.spreadsheet (as with gspread)
+        return self
+
+    @property
+    def meta(self):
+        if self._meta is None:
+            self._meta = self.client.sheet_meta(self.id, self.title)
+        return self._meta
+
+    @property
+    def row_count(self) -> int:
+        return self.meta["rows"]
+
+    def _refresh(self):
+        """Re-resolve the sheet by gid (follows renames); returns the old title."""
+        old = self.title
+        gid = self.meta.get("gid")
+        sheets = self.client.fetch_sheets(self.id)
+        for t, m in sheets.items():
+            if m["gid"] == gid:
+                self.title, self._meta = t, m
+                break
+        else:
+            raise SheetNotFound(f"Worksheet '{old}' (gid {gid}) no longer exists in {self.id}")
+        if self.title != old:
+            log(f"Worksheet '{old}' was renamed to '{self.title}'")
+        return old
+
+    def _fit_rows(self, last_row: int):
+        """After a grid-limit 400: the cached row count was too high (rows deleted in the sheet)."""
+        with self._grid_lock:
+            self._refresh()
+            missing = last_row - self.row_count
+            if missing > 0:
+                log(f"Worksheet '{self.title}' has only {self.row_count} rows; adding {missing}")
+                self.add_rows(missing)
+
+    def _retry_on_range_error(self, fn, last_row=0):
+        try:
+            return fn()
+        except requests.HTTPError as e:
+            if last_row and _is_grid_error(e):
+                self._fit_rows(last_row)
+                return fn()
+            if not _is_range_error(e):
+                raise
+            self._refresh()
+            return fn()
+
+    def _a1(self, rng: str) -> str:
+        return rng if "!" in rng else f"{_quote_title(self.title)}!{rng}"
+
+    # ---- values ----
+    def batch_get(self, ranges, value_render_option=None):
+        def call():
+            params = [("ranges", self._a1(r)) for r in ranges]
+            if value_render_option:
+                params.append(("valueRenderOption", value_render_option))
+            res = self.client.request("GET", f"/spreadsheets/{self.id}/values:batchGet", params=params)
+            return [vr.get("values", []) for vr in res.get("valueRanges", [])]
+        return self._retry_on_range_error(call)
+
+    def values_batch_update(self, body):
+        def call():
+            return self.client.request("POST", f"/spreadsheets/{self.id}/values:batchUpdate", json=body)
+        try:
+            return call()
+        except requests.HTTPError as e:
+            if _is_grid_error(e):
+                self._fit_rows(max(_end_row(d["range"], len(d.get("values", []))) for d in body["data"]))
+                return call()
+            if not _is_range_error(e):
+                raise
+            old = _quote_title(self._refresh()) + "!"
+            new = _quote_title(self.title) + "!"
+            body = {**body, "data": [{**d, "range": d["range"].replace(old, new, 1)} for d in body["data"]]}
+            return call()
+
+    def update(self, rng, values, value_input_option="RAW"):
+        return self._retry_on_range_error(lambda: self.client.request(
+            "PUT", f"/spreadsheets/{self.id}/values/{quote(self._a1(rng))}",
+            params={"valueInputOption": value_input_option}, json={"values": values}), _end_row(rng, len(values)))
+
+    def batch_clear(self, ranges):
+        return self._retry_on_range_error(lambda: self.client.request(
+            "POST", f"/spreadsheets/{self.id}/values:batchClear", json={"ranges": [self._a1(r) for r in ranges]}))
+
+    # ---- grid ----
+    def add_rows(self, n: int):
+        self.client.request("POST", f"/spreadsheets/{self.id}:batchUpdate", json={"requests": [
+            {"appendDimension": {"sheetId": self.meta["gid"], "dimension": "ROWS", "length": n}}
+        ]})
+        self.meta["rows"] += n
+        self.client.update_meta(self.id, self.title, rows=self.meta["rows"])
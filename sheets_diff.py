@@ -0,0 +1,271 @@
+import itertools
+import json
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+from sheet_values import to_cell
+
+# Optional dependency: ijson (pip install ijson) — without it the snapshot is loaded in one piece
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def col_letter(n: int) -> str:
+    """1 -> A, 2 -> B, ..."""
+    s = ""
+    while n:
+        n, r = divmod(n - 1, 26)
+        s = chr(65 + r) + s
+    return s
+
+
+# =========================
+# Cell normalization
+# =========================
+def normalize_cell(v):
+    """Make a value JSON/Sheets-safe (see sheet_values.to_cell); integral floats -> int."""
+    v = to_cell(v)
+    if type(v) is float and v.is_integer():
+        return int(v)
+    return v
+
+
+def _key(v) -> tuple:
+    """Comparison key: type and value, so "1" -> 1 (text to number) counts as a change."""
+    v = normalize_cell(v)
+    return type(v), v
+
+
+def _pad(row, width):
+    row = list(row)
+    return row + [""] * (width - len(row)) if len(row) < width else row[:width]
+
+
+# =========================
+# Snapshot of the last upload
+# =========================
+def _sheet_key(worksheet) -> str:
+    return f"{worksheet.spreadsheet.id}:{worksheet.title}"
+
+
+def load_snapshot(path, worksheet):
+    """
+    (meta, rows) of the last upload to 'worksheet', or None when unusable. 'meta'
+    holds the row count, header and last row (see check_snapshot); the rows are
+    read lazily (ijson) when possible.
+    """
+    p = Path(path)
+    if not p.exists():
+        return None
+    try:
+        if ijson is None:
+            snap = json.loads(p.read_text(encoding="utf-8"))
+            meta, rows = snap, snap.get("values")
+        else:
+            meta = {}
+            with p.open("rb") as f:
+                for k, v in ijson.kvitems(f, "", use_float=True):  # small keys first; stop before "values"
+                    if k == "values":
+                        break
+                    meta[k] = v
+            rows = _iter_values(p)
+    except (OSError, ValueError):
+        return None
+    if meta.get("sheet") != _sheet_key(worksheet) or "rows" not in meta:
+        return None
+    return meta, rows
+
+
+def _iter_values(path):
+    with path.open("rb") as f:
+        yield from ijson.items(f, "values.item", use_float=True)
+
+
+def _same_row(a, b, width) -> bool:
+    return [_key(v) for v in _pad(a, width)] == [_key(v) for v in _pad(b, width)]
+
+
+def check_snapshot(worksheet, meta, width) -> bool:
+    """
+    Cheap check that the sheet still holds what the snapshot says (the sheet is
+    also written by Zipper.py/Metal.py and edited by hand): header, last row, and
+    nothing below it. One batch_get of three rows.
+    """
+    n, last_col = meta["rows"], col_letter(width)
+    res = worksheet.batch_get([f"A1:{last_col}1", f"A{max(n, 1)}:{last_col}{max(n, 1) + 1}"],
+                              value_render_option="UNFORMATTED_VALUE")
+    header = (res[0] or [[]])[0] if res else []
+    tail = res[1] if len(res) > 1 else []
+    tail = [list(r) for r in tail] + [[], []]
+    if n == 0:
+        return not header and not tail[0] and not tail[1]
+    return (_same_row(header, meta["header"], width) and _same_row(tail[0], meta["last"], width)
+            and _same_row(tail[1], [], width))
+
+
+class SnapshotWriter:
+    """
+    Writes the new snapshot while the diff walks the rows (no second full copy in
+    memory): tee() passes rows through and appends them to a temporary file,
+    commit() puts the row count, header and last row in front and moves it in
+    place, discard() drops it.
+    """
+
+    def __init__(self, path, worksheet):
+        self.path = Path(path)
+        self.tmp = self.path.with_suffix(self.path.suffix + ".rows.tmp")
+        self.sheet = _sheet_key(worksheet)
+        self.meta = {"rows": 0, "header": [], "last": []}
+
+    def tee(self, rows):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        meta = self.meta
+        with self.tmp.open("w", encoding="utf-8") as f:
+            sep = "["
+            for row in rows:
+                f.write(sep + json.dumps(row))
+                sep = ",\n"
+                if not meta["rows"]:
+                    meta["header"] = row
+                meta["rows"] += 1
+                meta["last"] = row
+                yield row
+            f.write("[]" if sep == "[" else "]")
+
+    def commit(self):
+        out = self.path.with_suffix(self.path.suffix + ".tmp")
+        with out.open("w", encoding="utf-8") as f, self.tmp.open(encoding="utf-8") as rows:
+            head = {"sheet": self.sheet, **self.meta}
+            f.write(json.dumps(head)[:-1] + ', "values": ')
+            shutil.copyfileobj(rows, f)
+            f.write("}")
+        out.replace(self.path)
+        self.tmp.unlink(missing_ok=True)
+
+    def discard(self):
+        self.tmp.unlink(missing_ok=True)
+
+
+def read_back(worksheet, width):
+    """Current sheet contents of A:<width> in one batch_get."""
+    res = worksheet.batch_get([f"A:{col_letter(width)}"], value_render_option="UNFORMATTED_VALUE")
+    return [list(r) for r in (res[0] if res else [])]
+
+
+# =========================
+# Diff
+# =========================
+def diff_ranges(old, new, width):
+    """
+    Compare two value matrices (header included) and return a list of
+    (a1_range, values) blocks covering changed rows, appended rows and
+    blanked-out tail rows. Consecutive changed rows are merged into one block
+    spanning the union of their changed columns.
+    """
+    blocks = []
+    run = None  # [start_row, first_col, last_col, rows]
+    blank = [""] * width
+    old_rows, new_rows = iter(old), iter(new)
+
+    def flush():
+        if run:
+            start, c0, c1, rows = run
+            a1 = f"{col_letter(c0 + 1)}{start + 1}:{col_letter(c1 + 1)}{start + len(rows)}"
+            blocks.append((a1, [r[c0:c1 + 1] for r in rows]))
+
+    for i in itertools.count():
+        new_row, old_row = next(new_rows, None), next(old_rows, None)
+        if new_row is None and old_row is None:
+            break
+        new_row = blank if new_row is None else _pad(new_row, width)
+        old_row = blank if old_row is None else _pad(old_row, width)
+        changed = [c for c in range(width) if _key(new_row[c]) != _key(old_row[c])]
+        if not changed:
+            flush()
+            run = None
+            continue
+        out_row = [normalize_cell(v) for v in new_row]
+        if run and run[0] + len(run[3]) == i:
+            run[1] = min(run[1], changed[0])
+            run[2] = max(run[2], changed[-1])
+            run[3].append(out_row)
+        else:
+            flush()
+            run = [i, changed[0], changed[-1], [out_row]]
+    flush()
+    return blocks
+
+
+def upload_diff(worksheet, values, snapshot_path, width=None, readback=False, log=log, writer=None):
+    """
+    Upload 'values' (header + rows, any iterable) to columns A:<width> by sending
+    only what changed since the last upload, in a single values.batchUpdate.
+
+    The previous state comes from the local snapshot once check_snapshot() finds
+    the sheet's header, last row and row count unchanged; otherwise (or with
+    'readback') it is read back from the sheet. Old and new rows are
+    walked once, side by side; only changed rows are kept, and the new snapshot
+    is written as the rows go by. With a 'writer' (sheets_writer.ChunkedWriter)
+    large diffs are split into several quota-paced requests. Returns the number
+    of cells written.
+    """
+    if width is None:
+        values = list(values)
+        width = max((len(r) for r in values), default=1)
+    counts = {"old": 0, "new": 0}
+
+    def counted(rows, key):
+        for r in rows:
+            counts[key] += 1
+            yield r
+
+    snap = None if readback else load_snapshot(snapshot_path, worksheet)
+    if snap is not None and not check_snapshot(worksheet, snap[0], width):
+        log("Sheet differs from the last upload (edited elsewhere?); reading current sheet contents…")
+        snap = None
+    elif snap is None and not readback:
+        log("No usable snapshot; reading current sheet contents…")
+    old = snap[1] if snap is not None else read_back(worksheet, width)
+
+    snapshot = SnapshotWriter(snapshot_path, worksheet)
+    new = snapshot.tee(counted(([normalize_cell(v) for v in _pad(r, width)] for r in values), "new"))
+    try:
+        blocks = diff_ranges(counted(old, "old"), new, width)
+    except Exception:
+        snapshot.discard()
+        Path(snapshot_path).unlink(missing_ok=True)  # e.g. a damaged snapshot file: read back next time
+        raise
+    if not blocks:
+        log("Sheet already up to date; nothing to upload.")
+        snapshot.commit()
+        return 0
+
+    if counts["new"] > worksheet.row_count:
+        worksheet.add_rows(counts["new"] - worksheet.row_count)
+
+    cells = sum(len(b[1]) * len(b[1][0]) for b in blocks)
+    log(f"Uploading {len(blocks)} changed range(s), {cells} cells "
+        f"(rows {counts['old']} → {counts['new']})…")
+    try:
+        if writer is not None:
+            writer.write_blocks(blocks)
+        else:
+            title = worksheet.title.replace("'", "''")
+            worksheet.spreadsheet.values_batch_update({
+                "valueInputOption": "RAW",
+                "data": [{"range": f"'{title}'!{a1}", "values": block} for a1, block in blocks],
+            })
+    except Exception:
+        # A partial upload leaves the sheet matching neither snapshot: force a read-back next time
+        snapshot.discard()
+        Path(snapshot_path).unlink(missing_ok=True)
+        raise
+    snapshot.commit()
+    return cells
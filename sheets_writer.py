@@ -0,0 +1,193 @@
+import json
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import requests
+
+from sheets_diff import col_letter
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+# =========================
+# Quota scheduling
+# =========================
+class TokenBucket:
+    """Blocking token bucket: 'rate' tokens per 'per' seconds, bursts up to 'capacity'."""
+
+    def __init__(self, rate: float, per: float = 60.0, capacity: float = None):
+        self.rate = rate / per
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, n: float = 1.0) -> float:
+        """Take n tokens, sleeping as needed; returns the time waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return waited
+                delay = (n - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class QuotaScheduler:
+    """
+    Write-request quotas of the Sheets API (per minute): one bucket per user and
+    one per project. Share one scheduler between every writer of a process.
+    """
+
+    def __init__(self, per_user_per_min: int = 60, per_project_per_min: int = 300):
+        self.user = TokenBucket(per_user_per_min)
+        self.project = TokenBucket(per_project_per_min)
+
+    def acquire(self) -> float:
+        return self.user.acquire() + self.project.acquire()
+
+
+# =========================
+# Splitting into size-bounded requests
+# =========================
+A1_RE = re.compile(r"^(?:(?P<sheet>.+)!)?(?P<c0>[A-Z]+)(?P<r0>\d+)(?::(?P<c1>[A-Z]+)(?P<r1>\d+))?$")
+
+
+def _col_index(letters: str) -> int:
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n
+
+
+def _row_bytes(row) -> int:
+    return len(json.dumps(row, ensure_ascii=False, default=str)) + 1
+
+
+def split_blocks(blocks, max_bytes: int):
+    """
+    Split (a1_range, values) blocks into row slices of at most ~max_bytes of
+    JSON each. Returns [(a1_range, values, bytes)].
+    """
+    out = []
+    for a1, values in blocks:
+        m = A1_RE.match(a1)
+        if not m:
+            raise ValueError(f"Unsupported A1 range: {a1}")
+        prefix = f"{m['sheet']}!" if m["sheet"] else ""
+        c0, r0 = m["c0"], int(m["r0"])
+        width = max((len(r) for r in values), default=1)
+        c1 = m["c1"] or col_letter(_col_index(c0) + width - 1)
+
+        start, size = 0, 0
+        for i, row in enumerate(values):
+            b = _row_bytes(row)
+            if size and size + b > max_bytes:
+                out.append((f"{prefix}{c0}{r0 + start}:{c1}{r0 + i - 1}", values[start:i], size))
+                start, size = i, 0
+            size += b
+        if start < len(values):
+            out.append((f"{prefix}{c0}{r0 + start}:{c1}{r0 + len(values) - 1}", values[start:], size))
+    return out
+
+
+def pack_requests(pieces, max_bytes: int):
+    """Group consecutive pieces into batchUpdate payloads of at most ~max_bytes."""
+    batches, cur, size = [], [], 0
+    for a1, values, b in pieces:
+        if cur and size + b > max_bytes:
+            batches.append((cur, size))
+            cur, size = [], 0
+        cur.append((a1, values))
+        size += b
+    if cur:
+        batches.append((cur, size))
+    return batches
+
+
+# =========================
+# Writer
+# =========================
+class ChunkedWriter:
+    """
+    Writes value blocks to a worksheet as several values.batchUpdate requests of
+    bounded size, sent concurrently under the shared quota scheduler. 429 and 5xx
+    answers are retried with exponential backoff (Retry-After is honoured).
+    'metrics' holds requests, retries, rows, bytes, throttle wait and elapsed time.
+    """
+
+    def __init__(self, worksheet, scheduler: QuotaScheduler = None, max_request_bytes: int = 1_500_000,
+                 workers: int = 4, retries: int = 6, backoff: float = 1.0, log=log):
+        self.ws = worksheet
+        self.scheduler = scheduler or QuotaScheduler()
+        self.max_request_bytes = max_request_bytes
+        self.workers = workers
+        self.retries = retries
+        self.backoff = backoff
+        self.log = log
+        self.metrics = {"requests": 0, "retries": 0, "rows": 0, "bytes": 0, "throttled_s": 0.0, "elapsed_s": 0.0}
+        self._lock = threading.Lock()
+
+    def _send(self, batch):
+        blocks, size = batch
+        title = self.ws.title.replace("'", "''")
+        body = {
+            "valueInputOption": "RAW",
+            "data": [{"range": a1 if "!" in a1 else f"'{title}'!{a1}", "values": v} for a1, v in blocks],
+        }
+        for attempt in range(self.retries + 1):
+            throttled = self.scheduler.acquire()
+            try:
+                self.ws.spreadsheet.values_batch_update(body)
+                break
+            except requests.HTTPError as e:
+                r = e.response
+                status = getattr(r, "status_code", None)
+                if attempt >= self.retries or not (status == 429 or (status or 0) >= 500):
+                    raise
+                retry_after = r.headers.get("Retry-After") if r is not None else None
+                delay = float(retry_after) if retry_after and retry_after.isdigit() \
+                    else self.backoff * (2 ** attempt) * (0.5 + random.random())
+                with self._lock:
+                    self.metrics["retries"] += 1
+                self.log(f"⚠️ Sheets {status}; retrying in {delay:.1f}s")
+                time.sleep(delay)
+            finally:
+                with self._lock:
+                    self.metrics["throttled_s"] += throttled
+        rows = sum(len(v) for _, v in blocks)
+        with self._lock:
+            self.metrics["requests"] += 1
+            self.metrics["rows"] += rows
+            self.metrics["bytes"] += size
+            done = self.metrics["rows"]
+        self.log(f"  wrote {rows} rows ({size / 1024:.0f} KiB) — {done}/{self._total_rows} rows")
+
+    def write_blocks(self, blocks):
+        """Write [(a1_range, values)] blocks; returns the metrics dict."""
+        start = time.monotonic()
+        pieces = split_blocks(blocks, self.max_request_bytes)
+        batches = pack_requests(pieces, self.max_request_bytes)
+        self._total_rows = sum(len(v) for _, v, _ in pieces)
+        if len(batches) > 1:
+            self.log(f"Writing {self._total_rows} rows in {len(batches)} requests ({self.workers} workers)…")
+        with ThreadPoolExecutor(max_workers=max(1, min(self.workers, len(batches)))) as pool:
+            list(pool.map(self._send, batches))
+        self.metrics["elapsed_s"] += time.monotonic() - start
+        return self.metrics
+
+    def write_table(self, values, width=None):
+        """Write a full table (header + rows) starting at A1."""
+        width = width or max((len(r) for r in values), default=1)
+        return self.write_blocks([(f"A1:{col_letter(width)}{len(values)}", values)])
@@ -0,0 +1,190 @@
+import argparse
+import re
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Optional dependency: pyarrow (pip install pyarrow). Imported on first use: it is
+# the slowest import of the RPC path and only the archive needs it.
+pa = pq = pc = None
+
+
+# =========================
+# Compressed Parquet archive of export runs
+#   <root>/date=YYYY-MM-DD/company=<ids>/<HHMMSS>_<job>.parquet
+# =========================
+FILE_RE = re.compile(r"^(\d{6})_(.+)\.parquet$")
+
+
+def _require_arrow():
+    global pa, pq, pc
+    if pa is None:
+        try:
+            import pyarrow
+            import pyarrow.compute
+            import pyarrow.parquet
+        except ImportError:
+            raise RuntimeError("Snapshot archive needs pyarrow (pip install pyarrow).") from None
+        pa, pq, pc = pyarrow, pyarrow.parquet, pyarrow.compute
+
+
+def _unique(names):
+    seen, out = {}, []
+    for n in names:
+        n = str(n)
+        if n in seen:
+            seen[n] += 1
+            n = f"{n} ({seen[n]})"
+        else:
+            seen[n] = 0
+        out.append(n)
+    return out
+
+
+def _column(values):
+    """Build an arrow array; Odoo's False-for-empty becomes null, mixed types fall back to strings."""
+    values = [None if v is False or v == "" else v for v in values]
+    try:
+        return pa.array(values)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return pa.array([None if v is None else str(v) for v in values], type=pa.string())
+
+
+def _buffer_column(buf, kind):
+    """Arrow array from one stream_decode.ColumnBuffers column; numeric ones without per-cell objects."""
+    if kind == "str":
+        return _column(buf)
+    arr = pa.Array.from_buffers(pa.float64(), len(buf), [None, pa.py_buffer(buf)])
+    arr = pc.if_else(pc.is_nan(arr), pa.scalar(None, pa.float64()), arr)  # NaN marks an empty cell
+    return arr.cast(pa.int64()) if kind == "int" else arr
+
+
+def _columns(rows, n):
+    """One arrow array per column: straight from ColumnBuffers' per-column data, else from the rows."""
+    data = getattr(rows, "data", None)
+    if data is not None:
+        arrays = [_buffer_column(buf, kind) for buf, kind in zip(data, rows.kinds)]
+        return arrays[:n] + [pa.nulls(len(rows))] * (n - len(arrays))
+    return [_column([r[i] if i < len(r) else None for r in rows]) for i in range(n)]
+
+
+def company_key(company_ids) -> str:
+    return "-".join(map(str, company_ids)) if isinstance(company_ids, (list, tuple)) else str(company_ids)
+
+
+def write_snapshot(root, company_ids, job, columns, rows, when: datetime = None) -> Path:
+    """Append one run's dataset (header + rows) to the archive as zstd-compressed Parquet."""
+    _require_arrow()
+    when = when or datetime.now()
+    names = _unique(columns)
+    table = pa.table(dict(zip(names, _columns(rows, len(names)))))
+    part = Path(root) / f"date={when:%Y-%m-%d}" / f"company={company_key(company_ids)}"
+    part.mkdir(parents=True, exist_ok=True)
+    path = part / f"{when:%H%M%S}_{job}.parquet"
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(table, tmp, compression="zstd")
+    tmp.replace(path)
+    return path
+
+
+def list_snapshots(root, company_ids=None, job=None):
+    """Return [(datetime, company, job, path)] sorted oldest first."""
+    out = []
+    for day in Path(root).glob("date=*"):
+        for comp in day.glob("company=*"):
+            company = comp.name.split("=", 1)[1]
+            if company_ids is not None and company != company_key(company_ids):
+                continue
+            for f in comp.glob("*.parquet"):
+                m = FILE_RE.match(f.name)
+                if not m or (job and m.group(2) != job):
+                    continue
+                ts = datetime.strptime(f"{day.name.split('=', 1)[1]} {m.group(1)}", "%Y-%m-%d %H%M%S")
+                out.append((ts, company, m.group(2), f))
+    out.sort(key=lambda x: x[0])
+    return out
+
+
+def prune_snapshots(root, keep_days: float, now: datetime = None):
+    """Delete snapshots older than 'keep_days' (and partitions left empty); returns the deleted paths."""
+    cutoff = (now or datetime.now()) - timedelta(days=keep_days)
+    removed = []
+    for ts, _, _, path in list_snapshots(root):
+        if ts < cutoff:
+            path.unlink(missing_ok=True)  # another run may be pruning too (daemon.py)
+            removed.append(path)
+    for part in sorted(Path(root).glob("date=*/company=*")) + sorted(Path(root).glob("date=*")):
+        try:
+            part.rmdir()  # only succeeds when empty
+        except OSError:
+            pass
+    return removed
+
+
+def load_snapshot(root, company_ids, at: datetime = None, job=None):
+    """Memory-map the latest snapshot taken at or before 'at' (default: latest) as a pyarrow Table."""
+    _require_arrow()
+    snaps = [s for s in list_snapshots(root, company_ids, job) if at is None or s[0] <= at]
+    if not snaps:
+        raise FileNotFoundError(f"No snapshot for company {company_key(company_ids)} before {at or 'now'}")
+    return pq.read_table(snaps[-1][3], memory_map=True)
+
+
+def diff_snapshots(old, new, key=None):
+    """
+    Compare two snapshot tables on a key column (default: first column).
+    Returns pandas frames {"added", "removed", "changed"}; "changed" holds old/new
+    values side by side for rows whose key exists in both but whose values differ.
+    """
+    old_df, new_df = old.to_pandas(), new.to_pandas()
+    key = key or new_df.columns[0]
+    old_df = old_df.drop_duplicates(subset=[key]).set_index(key)
+    new_df = new_df.drop_duplicates(subset=[key]).set_index(key)
+    added = new_df.loc[new_df.index.difference(old_df.index)]
+    removed = old_df.loc[old_df.index.difference(new_df.index)]
+    common = new_df.index.intersection(old_df.index)
+    cols = [c for c in new_df.columns if c in old_df.columns]
+    a, b = old_df.loc[common, cols], new_df.loc[common, cols]
+    mask = ~((a == b) | (a.isna() & b.isna())).all(axis=1)
+    changed = a[mask].join(b[mask], lsuffix=" (old)", rsuffix=" (new)")
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+# =========================
+# CLI: python snapshots.py list|diff|prune …
+# =========================
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Browse the export snapshot archive")
+    ap.add_argument("--root", default=".cache/snapshots")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    ls = sub.add_parser("list")
+    ls.add_argument("--company")
+    df = sub.add_parser("diff", help="diff the snapshots at two points in time")
+    df.add_argument("company")
+    df.add_argument("old", help="YYYY-MM-DDTHH:MM")
+    df.add_argument("new", nargs="?", help="YYYY-MM-DDTHH:MM (default: latest)")
+    df.add_argument("--job")
+    df.add_argument("--key")
+    pr = sub.add_parser("prune", help="delete snapshots older than --days")
+    pr.add_argument("--days", type=float, required=True)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "list":
+        for ts, company, job, path in list_snapshots(args.root, args.company):
+            print(f"{ts:%Y-%m-%d %H:%M:%S}  company={company:<6} {job:<10} {path.stat().st_size:>10,d} B  {path}")
+        return
+    if args.cmd == "prune":
+        removed = prune_snapshots(args.root, args.days)
+        print(f"Deleted {len(removed)} snapshot(s) older than {args.days:g} days")
+        return
+
+    old = load_snapshot(args.root, args.company, datetime.fromisoformat(args.old), args.job)
+    new = load_snapshot(args.root, args.company, datetime.fromisoformat(args.new) if args.new else None, args.job)
+    res = diff_snapshots(old, new, args.key)
+    for name, frame in res.items():
+        print(f"== {name}: {len(frame)} rows")
+        if len(frame):
+            print(frame.head(50).to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+import csv
+import io
+import json
+import math
+from array import array
+
+# Optional dependency: ijson (pip install ijson) — without it responses are decoded in one piece
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+
+# =========================
+# Column kinds from fields_get types
+# =========================
+KIND_BY_TYPE = {"float": "float", "monetary": "float", "integer": "int"}
+EMPTY = False  # export_data's empty cell; the buffers, frames and the csv engine give empty cells this too
+
+
+def column_kinds(field_names, field_types):
+    """'float' / 'int' for plain numeric fields (typed buffers), 'str' for everything else."""
+    kinds = []
+    for name in field_names:
+        if name == ".id":
+            kinds.append("int")
+        elif "/" in name:
+            kinds.append("str")
+        else:
+            kinds.append(KIND_BY_TYPE.get(field_types.get(name), "str"))
+    return kinds
+
+
+# =========================
+# Compact DataFrame dtypes from fields_get types
+# =========================
+DTYPE_BY_TYPE = {"many2one": "category", "selection": "category", "float": "float", "monetary": "float",
+                 "integer": "int", "date": "date", "datetime": "datetime"}
+DATE_FORMATS = {"date": "%Y-%m-%d", "datetime": "%Y-%m-%d %H:%M:%S"}
+
+
+def frame_dtypes(field_names, field_types):
+    """
+    Target dtype per export column: 'category' (many2one labels / xml ids,
+    selections), 'float', 'int', 'date', 'datetime', or None (stays object).
+    """
+    dtypes = []
+    for name in field_names:
+        if name == ".id":
+            dtypes.append("int")
+        elif "/" in name:
+            dtypes.append("category" if field_types.get(name.split("/", 1)[0]) == "many2one" else None)
+        else:
+            dtypes.append(DTYPE_BY_TYPE.get(field_types.get(name)))
+    return dtypes
+
+
+def _without_false(s):
+    """Odoo's False-for-empty (and other booleans) as missing, so the column can be parsed."""
+    return s.where(s.map(type) != bool) if s.dtype == object else s
+
+
+def compact_frame(df, dtypes):
+    """
+    Convert the columns of an export DataFrame, in place, to the dtypes of
+    frame_dtypes(): repeated labels become categories (False stays a category
+    of its own), numbers numeric arrays, dates datetime64 (empty -> NaT); other
+    object columns get whatever pandas infers.
+    """
+    import pandas as pd
+
+    for i, dtype in enumerate(dtypes):
+        s = df.iloc[:, i]
+        if dtype == "category":
+            s = s.astype("category")
+        elif dtype in ("float", "int"):
+            s = pd.to_numeric(_without_false(s), errors="coerce")
+            s = s.astype("int64") if dtype == "int" and not s.isna().any() else s.astype("float64")
+        elif dtype in DATE_FORMATS:
+            s = pd.to_datetime(_without_false(s), format=DATE_FORMATS[dtype], errors="coerce")
+        elif s.dtype == object:
+            s = s.infer_objects()  # plain text: pandas' string dtype where available
+        else:
+            continue
+        df.isetitem(i, s)
+    return df
+
+
+def frame_rows(df, dtypes=None):
+    """
+    Rows of an export frame (compact or not) with the values export_data would
+    have given: dates back to Odoo's strings, integers back to ints and empty
+    numbers / dates to EMPTY, so uploads do not change.
+    """
+    cols = []
+    for i in range(df.shape[1]):
+        s = df.iloc[:, i]
+        dtype = dtypes[i] if dtypes else None
+        if dtype in DATE_FORMATS and s.dtype.kind == "M":
+            s = s.dt.strftime(DATE_FORMATS[dtype]).astype(object).where(s.notna(), EMPTY)
+        elif s.dtype.kind == "f":
+            to_int = dtype == "int"
+            cols.append([EMPTY if v != v else int(v) if to_int else v for v in s.tolist()])  # v != v: NaN
+            continue
+        cols.append(s.tolist())
+    return [list(r) for r in zip(*cols)]
+
+
+# =========================
+# Per-column buffers
+# =========================
+class ColumnBuffers:
+    """
+    Export rows stored column by column: numeric columns in array('d') (NaN for
+    empty), other columns in plain lists with repeated strings shared. Iterating
+    yields rows like export_data (empty numbers as EMPTY).
+    """
+
+    def __init__(self, columns, kinds):
+        self.columns = list(columns)
+        self.kinds = list(kinds)
+        self.data = [array("d") if k != "str" else [] for k in self.kinds]
+        self._seen = [{} for _ in self.kinds]  # per-column string dedupe
+        self._n = 0
+
+    def __len__(self):
+        return self._n
+
+    def append(self, row):
+        for i, buf in enumerate(self.data):
+            v = row[i] if i < len(row) else None
+            if self.kinds[i] == "str":
+                buf.append(self._seen[i].setdefault(v, v) if isinstance(v, str) else v)
+            else:
+                try:
+                    buf.append(math.nan if v is None or v is False or v == "" else float(v))
+                except (TypeError, ValueError):
+                    buf.append(math.nan)
+        self._n += 1
+
+    def extend(self, other: "ColumnBuffers"):
+        for mine, theirs in zip(self.data, other.data):
+            mine.extend(theirs)
+        self._n += len(other)
+
+    @classmethod
+    def concat(cls, parts):
+        parts = list(parts)
+        out = cls(parts[0].columns, parts[0].kinds)
+        for p in parts:
+            out.extend(p)
+        return out
+
+    def __iter__(self):
+        cols = []
+        for kind, buf in zip(self.kinds, self.data):
+            if kind == "str":
+                cols.append(buf)
+            elif kind == "int":
+                cols.append(map(lambda v: EMPTY if v != v else int(v), buf))  # v != v: NaN
+            else:
+                cols.append(map(lambda v: EMPTY if v != v else v, buf))
+        return map(list, zip(*cols))
+
+    def to_dataframe(self):
+        """Build a DataFrame; numeric columns come straight from the typed buffers (no per-cell objects)."""
+        import numpy as np
+        import pandas as pd
+
+        series = []
+        for name, kind, buf in zip(self.columns, self.kinds, self.data):
+            if kind == "str":
+                series.append(pd.Series(buf, name=name, dtype=object))
+                continue
+            arr = np.frombuffer(buf, dtype=np.float64) if len(buf) else np.empty(0)
+            if kind == "int" and not np.isnan(arr).any():
+                arr = arr.astype(np.int64)
+            series.append(pd.Series(arr, name=name, copy=False))
+        if not series:
+            return pd.DataFrame()
+        return pd.concat(series, axis=1, copy=False)
+
+
+# =========================
+# Streaming decoder for call_kw responses
+# =========================
+def decode_export_stream(fp, columns, kinds) -> ColumnBuffers:
+    """
+    Parse a JSON-RPC export_data response from a file-like object, appending each
+    row of result.datas to ColumnBuffers as soon as it is complete. Only one row
+    is held as Python objects at a time. JSON-RPC errors raise RuntimeError.
+    """
+    buffers = ColumnBuffers(columns, kinds)
+    if ijson is None:
+        res = json.load(fp)
+        if "error" in res:
+            raise RuntimeError(res["error"])
+        for row in (res.get("result") or {}).get("datas", []):
+            buffers.append(row)
+        return buffers
+
+    # Rows are built by ijson's C backend (items), not event by event in Python
+    head = _Head(fp)
+    for row in ijson.items(head, "result.datas.item", use_float=True):
+        head.keep = False
+        buffers.append(row)
+    if head.keep and head.data:  # no rows: an empty result or an error response (both small)
+        res = json.loads(bytes(head.data))
+        if "error" in res:
+            raise RuntimeError(res["error"])
+    return buffers
+
+
+class _Head:
+    """File wrapper keeping the bytes read while 'keep' is set (until the first row)."""
+
+    def __init__(self, fp):
+        self.fp = fp
+        self.keep = True
+        self.data = bytearray()
+
+    def read(self, n=-1):
+        chunk = self.fp.read(n)
+        if self.keep:
+            self.data += chunk.encode("utf-8") if isinstance(chunk, str) else chunk
+        return chunk
+
+
+# =========================
+# Streaming decoder for /web/export/csv responses
+# =========================
+# Odoo prefixes text cells starting with =, + or - with a quote (formula injection guard)
+_ESCAPED = ("'=", "'+", "'-")
+
+
+def decode_export_csv(fp, columns, kinds, encoding="utf-8-sig") -> ColumnBuffers:
+    """
+    Parse the CSV produced by Odoo's /web/export/csv controller from a binary
+    file-like object, row by row, into ColumnBuffers. The header line (labels) is
+    skipped; numeric columns are converted by ColumnBuffers from their text, and
+    empty cells ('' in the file) become EMPTY, as export_data returns them.
+    """
+    buffers = ColumnBuffers(columns, kinds)
+    text = io.TextIOWrapper(fp, encoding=encoding, newline="")
+    reader = csv.reader(text)
+    next(reader, None)
+    str_cols = [i for i, k in enumerate(kinds) if k == "str"]
+    for row in reader:
+        for i in str_cols:
+            if i >= len(row):
+                continue
+            if not row[i]:
+                row[i] = EMPTY
+            elif row[i].startswith(_ESCAPED):
+                row[i] = row[i][1:]
+        buffers.append(row)
+    text.detach()  # leave closing the response to its owner
+    return buffers
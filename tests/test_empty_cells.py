@@ -0,0 +1,67 @@
+"""
+Every export path gives empty cells the same value as export_data (False):
+the plain rows, the json and csv stream decoders, and rows rebuilt from a
+DataFrame with or without compact dtypes.
+
+    python -m pytest tests
+"""
+import io
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from stream_decode import (EMPTY, ColumnBuffers, column_kinds, compact_frame, decode_export_csv,  # noqa: E402
+                           decode_export_stream, frame_dtypes, frame_rows)
+
+FIELDS = ["name", "partner_id/name", "qty", "count", "date"]
+TYPES = {"name": "char", "partner_id": "many2one", "qty": "float", "count": "integer", "date": "date"}
+# export_data's rows: False for every empty cell
+ROWS = [
+    ["A-1", "Partner", 1.5, 3, "2026-01-02"],
+    [False, False, False, False, False],
+]
+CSV = "name,partner,qty,count,date\r\nA-1,Partner,1.5,3,2026-01-02\r\n,,,,\r\n"
+
+
+def json_rows():
+    body = json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"datas": ROWS}}).encode()
+    return list(decode_export_stream(io.BytesIO(body), FIELDS, column_kinds(FIELDS, TYPES)))
+
+
+def csv_rows():
+    return list(decode_export_csv(io.BytesIO(CSV.encode("utf-8-sig")), FIELDS, column_kinds(FIELDS, TYPES)))
+
+
+def frame_from_buffers(compact):
+    pytest.importorskip("pandas")
+    buffers = ColumnBuffers(FIELDS, column_kinds(FIELDS, TYPES))
+    for row in ROWS:
+        buffers.append(row)
+    df = buffers.to_dataframe()
+    dtypes = frame_dtypes(FIELDS, TYPES) if compact else None
+    return frame_rows(compact_frame(df, dtypes) if compact else df, dtypes)
+
+
+def frame_from_list(compact):
+    pd = pytest.importorskip("pandas")
+    df = pd.DataFrame(ROWS, columns=FIELDS)
+    dtypes = frame_dtypes(FIELDS, TYPES) if compact else None
+    return frame_rows(compact_frame(df, dtypes) if compact else df, dtypes)
+
+
+@pytest.mark.parametrize("rows", [
+    json_rows,
+    csv_rows,
+    lambda: frame_from_buffers(False),
+    lambda: frame_from_buffers(True),
+    lambda: frame_from_list(False),
+    lambda: frame_from_list(True),
+], ids=["json", "csv", "buffers-frame", "buffers-compact", "list-frame", "list-compact"])
+def test_empty_cells_match_export_data(rows):
+    got = rows()
+    assert got == ROWS
+    assert all(v is EMPTY for v in got[1])
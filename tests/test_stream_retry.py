@@ -0,0 +1,108 @@
+"""
+Streamed export bodies cut short by the server are retried like any other
+transport error (OdooRpc._request), for export_data and /web/export/csv.
+
+    python -m pytest tests
+"""
+import json
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from urllib3.exceptions import ProtocolError
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from odoo_rpc import OdooRpc, export_data_chunked  # noqa: E402
+
+ROWS = [["A-%d" % i, float(i)] for i in range(2000)]
+
+
+class TruncatingOdoo(ThreadingHTTPServer):
+    """Answers export requests; the first 'cut' responses stop halfway through the body."""
+
+    def __init__(self, cut):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.cut = cut
+        self.exports = 0
+        self.lock = threading.Lock()
+        self.daemon_threads = True
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *a):
+        pass
+
+    def _send(self, body: bytes, content_type):
+        srv = self.server
+        with srv.lock:
+            truncate = self.path != "/web" and srv.exports < srv.cut
+            if self.path != "/web":
+                srv.exports += 1
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body[:len(body) // 2] if truncate else body)
+        if truncate:
+            self.close_connection = True
+
+    def do_GET(self):
+        self._send(b'<script>odoo = {csrf_token: "abc123"};</script>', "text/html")
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if self.path == "/web/export/csv":
+            lines = ["Code,Qty"] + [f"{c},{q}" for c, q in ROWS]
+            return self._send(("\r\n".join(lines) + "\r\n").encode("utf-8"), "text/csv;charset=utf8")
+        ids = json.loads(raw)["params"]["args"][0]
+        body = json.dumps({"jsonrpc": "2.0", "id": None, "result": {"datas": [ROWS[i] for i in ids]}}).encode("utf-8")
+        self._send(body, "application/json")
+
+
+@pytest.fixture
+def server():
+    servers = []
+
+    def start(cut):
+        srv = TruncatingOdoo(cut)
+        threading.Thread(target=srv.serve_forever, daemon=True).start()
+        servers.append(srv)
+        return srv, OdooRpc(f"http://127.0.0.1:{srv.server_port}", retries=2, backoff=0.01)
+
+    yield start
+    for srv in servers:
+        srv.shutdown()
+        srv.server_close()
+
+
+@pytest.mark.parametrize("engine", ["json", "csv"])
+def test_truncated_stream_is_retried(server, engine):
+    srv, rpc = server(cut=1)
+    fetch = rpc.export_data_stream if engine == "json" else rpc.export_csv_stream
+    rows = fetch("x.model", list(range(len(ROWS))), ["code", "qty"], {}, ["str", "float"])
+    assert list(rows) == ROWS
+    method = "export_data" if engine == "json" else "export_csv"
+    assert rpc.stats[method]["retries"] == 1
+    assert srv.exports == 2
+
+
+def test_truncated_stream_fails_after_retries(server):
+    srv, rpc = server(cut=10)
+    with pytest.raises(ProtocolError):
+        rpc.export_data_stream("x.model", [1], ["code", "qty"], {}, ["str", "float"])
+    assert srv.exports == 3  # first try + 2 retries
+
+
+def test_chunked_export_survives_a_dropped_chunk(server):
+    srv, rpc = server(cut=1)
+    ids = list(range(len(ROWS)))
+    fetch = lambda chunk: rpc.export_data_stream("x.model", chunk, ["code", "qty"], {}, ["str", "float"])
+    rows = export_data_chunked(rpc.call_kw, "x.model", ids, ["code", "qty"], chunk_size=500, min_chunk=500,
+                               max_workers=2, log=lambda msg: None, fetch=fetch)
+    assert list(rows) == ROWS
+    assert rpc.stats["export_data"]["retries"] == 1
@@ -0,0 +1,80 @@
+import time
+from datetime import datetime
+
+# Rust-based xlsx/xls reader: pip install python-calamine
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+
+def log(msg: str):
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] {msg}", flush=True)
+
+
+def _blank(row) -> bool:
+    return all(v is None or v == "" for v in row)
+
+
+def _trim(rows):
+    """Drop trailing empty rows (formatting past the data), like pandas does."""
+    end = len(rows)
+    while end and _blank(rows[end - 1]):
+        end -= 1
+    del rows[end:]
+    return rows
+
+
+# =========================
+# Readers: first sheet, first 'ncols' columns, as plain Python rows
+# =========================
+def _read_calamine(source, ncols):
+    # No column pushdown: calamine parses every column of the sheet. iter_rows hands
+    # rows over one at a time, so only the first 'ncols' cells of each are kept.
+    wb = CalamineWorkbook.from_object(source)
+    return [row[:ncols] for row in wb.get_sheet_by_index(0).iter_rows()]
+
+
+def _read_openpyxl(source, ncols):
+    from openpyxl import load_workbook
+    # read_only streams the sheet XML; max_col stops each row at column 'ncols'
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        return [list(row) for row in wb.worksheets[0].iter_rows(max_col=ncols, values_only=True)]
+    finally:
+        wb.close()
+
+
+def _read_pandas(source, suffix, ncols):
+    import pandas as pd
+    df = pd.read_csv(source) if suffix == ".csv" else pd.read_excel(source)
+    df = df.iloc[:, :ncols]
+    return [df.columns.tolist()] + df.values.tolist()
+
+
+def read_export(source, suffix: str = ".xlsx", ncols: int = 10, log=log):
+    """
+    Read an Odoo export (path or file-like, e.g. CapturedExport.open()) and
+    return (header, rows) of its first sheet, cut to the first 'ncols' columns
+    (A:J) without building a DataFrame.
+
+    .xlsx/.xls go through python-calamine when installed (whole sheet parsed,
+    rows cut one by one), else .xlsx through openpyxl in read-only mode (stops
+    each row at column 'ncols'). CSV (and .xls without calamine) use pandas.
+    """
+    start = time.monotonic()
+    suffix = suffix.lower()
+    if suffix not in (".xlsx", ".xls", ".csv"):
+        raise ValueError(f"Unsupported file type: {suffix}")
+    if suffix != ".csv" and CalamineWorkbook is not None:
+        engine, rows = "calamine", _read_calamine(source, ncols)
+    elif suffix == ".xlsx":
+        engine, rows = "openpyxl", _read_openpyxl(source, ncols)
+    else:
+        engine, rows = "pandas", _read_pandas(source, suffix, ncols)
+    _trim(rows)
+    if not rows:
+        raise ValueError("Export file is empty")
+    header, rows = rows[0], rows[1:]
+    log(f"⏱️ parsed {len(rows)} rows × {len(header)} columns with {engine} in {time.monotonic() - start:.2f}s")
+    return header, rows